@@ -0,0 +1,8 @@
+import os
+import tempfile
+
+# Keep the caches, archive and job journal of the module under test away
+# from the real XDG directories; set before yt_dlx_backend is imported.
+_ROOT = tempfile.mkdtemp(prefix="yt-dlx-tests-")
+for _name in ("XDG_CACHE_HOME", "XDG_DATA_HOME", "XDG_STATE_HOME"):
+    os.environ[_name] = os.path.join(_ROOT, _name.lower())
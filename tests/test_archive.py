@@ -0,0 +1,67 @@
+import os
+
+import pytest
+
+import yt_dlx_backend
+from yt_dlx_backend import DownloadArchive, FetchOptions, YouTubeFetcher
+
+URL = "https://www.youtube.com/watch?v=dQw4w9WgXcQ"
+
+
+@pytest.fixture
+def archived(monkeypatch, tmp_path):
+    # One archived download, Music/Song.mp3
+    archive = DownloadArchive(str(tmp_path / "archive.sqlite3"))
+    monkeypatch.setattr(yt_dlx_backend, "ARCHIVE", archive)
+    music = tmp_path / "Music"
+    music.mkdir()
+    song = music / "Song.mp3"
+    song.write_bytes(b"ID3 song")
+    archive.record("dQw4w9WgXcQ", "mp3", str(song))
+    yield str(song)
+    archive.close()
+
+
+def download(output_path, **options):
+    return YouTubeFetcher.download_video(URL, "mp3", str(output_path), quiet=True, options=FetchOptions(**options))
+
+
+def test_same_location_is_skipped(archived, tmp_path):
+    assert download(tmp_path / "Music") == archived
+    assert os.listdir(tmp_path / "Music") == ["Song.mp3"]
+
+
+def test_other_directory_gets_a_hard_link(archived, tmp_path):
+    target = download(tmp_path / "Other")
+    assert target == str(tmp_path / "Other" / "Song.mp3")
+    assert os.path.samefile(target, archived)
+
+
+def test_explicit_file_name(archived, tmp_path):
+    target = download(tmp_path / "Other" / "renamed.mp3")
+    assert target == str(tmp_path / "Other" / "renamed.mp3")
+    assert open(target, "rb").read() == b"ID3 song"
+
+
+def test_copied_when_linking_fails(archived, tmp_path, monkeypatch):
+    def link(src, dst):
+        raise OSError(18, "Invalid cross-device link")
+
+    monkeypatch.setattr(os, "link", link)
+    target = download(tmp_path / "Other")
+    assert not os.path.samefile(target, archived)
+    assert open(target, "rb").read() == b"ID3 song"
+    assert os.listdir(tmp_path / "Other") == ["Song.mp3"]
+
+
+def test_existing_file_at_the_target_is_kept(archived, tmp_path):
+    other = tmp_path / "Other"
+    other.mkdir()
+    (other / "Song.mp3").write_bytes(b"mine")
+    assert download(other) == str(other / "Song.mp3")
+    assert (other / "Song.mp3").read_bytes() == b"mine"
+
+
+def test_dry_run_places_nothing(archived, tmp_path):
+    assert download(tmp_path / "Other", dry_run=True) == str(tmp_path / "Other" / "Song.mp3")
+    assert not (tmp_path / "Other" / "Song.mp3").exists()
@@ -0,0 +1,78 @@
+import threading
+import time
+
+import pytest
+
+from yt_dlx_backend import BandwidthLimiter, format_rate, parse_rate
+
+MiB = 2**20
+
+
+def run_jobs(limiter, jobs, chunk, duration):
+    # Each thread plays one download feeding the limiter's progress hook
+    moved = {}
+
+    def job(name):
+        hook = limiter.progress_hook()
+        done, started = 0, time.monotonic()
+        while time.monotonic() - started < duration:
+            done += chunk
+            hook({"status": "downloading", "filename": name, "downloaded_bytes": done})
+        moved[name] = done
+
+    threads = [threading.Thread(target=job, args=(f"job{i}",)) for i in range(jobs)]
+    started = time.monotonic()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return moved, time.monotonic() - started
+
+
+def test_parse_rate():
+    assert parse_rate("5M") == 5 * MiB
+    assert parse_rate("800k") == 800 * 1024
+    assert parse_rate("1.5MiB/s") == 1.5 * MiB
+    assert parse_rate("12") == 12
+    assert parse_rate("fast") is None
+    assert format_rate(0) == "unlimited"
+
+
+@pytest.mark.parametrize("jobs,chunk", [(1, 64 * 1024), (8, 512 * 1024), (8, MiB)])
+def test_combined_rate_stays_under_the_cap(jobs, chunk):
+    rate = 4 * MiB
+    limiter = BandwidthLimiter(rate=rate)
+    moved, elapsed = run_jobs(limiter, jobs, chunk, duration=2.0)
+    total = sum(moved.values())
+    # Every counted chunk went through the hook: the cap plus the idle burst
+    assert total <= rate * (elapsed + limiter.BURST) + chunk
+    assert total >= rate * elapsed * 0.7
+
+
+def test_jobs_share_the_cap_fairly():
+    moved, _ = run_jobs(BandwidthLimiter(rate=MiB), 4, 64 * 1024, duration=2.0)
+    assert max(moved.values()) <= 2 * min(moved.values())
+
+
+def test_min_share_is_kept_above_the_cap():
+    limiter = BandwidthLimiter(rate=MiB, min_share=0.5 * MiB)
+    moved, elapsed = run_jobs(limiter, 4, 64 * 1024, duration=2.0)
+    for done in moved.values():
+        assert done >= 0.5 * MiB * elapsed * 0.8
+
+
+def test_min_share_debt_does_not_stall_later_jobs():
+    limiter = BandwidthLimiter(rate=MiB, min_share=0.5 * MiB)
+    run_jobs(limiter, 4, 64 * 1024, duration=1.0)
+    limiter.configure(min_share=0)
+    moved, elapsed = run_jobs(limiter, 2, 64 * 1024, duration=2.0)
+    assert sum(moved.values()) >= MiB * (elapsed - limiter.BURST) * 0.8
+
+
+def test_reconfigure_applies_to_running_jobs():
+    limiter = BandwidthLimiter(rate=MiB)
+    timer = threading.Timer(1.0, limiter.configure, kwargs={"rate": 4 * MiB})
+    timer.start()
+    moved, _ = run_jobs(limiter, 2, 64 * 1024, duration=2.0)
+    timer.join()
+    assert sum(moved.values()) >= 3.5 * MiB
@@ -0,0 +1,136 @@
+import threading
+import time
+import types
+
+import pytest
+
+import yt_dlx_backend
+from yt_dlx_backend import ConcurrencyController
+
+MiB = 2**20
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Rounds are timed with time.monotonic(); this one only moves on demand
+    now = [1000.0]
+    monkeypatch.setattr(yt_dlx_backend, "time", types.SimpleNamespace(monotonic=lambda: now[0]))
+
+    def advance(seconds):
+        now[0] += seconds
+
+    return advance
+
+
+def controller(maximum=16, minimum=1, limit=None):
+    logged = []
+    ctrl = ConcurrencyController(maximum, minimum, log=logged.append)
+    if limit is not None:
+        ctrl.limit = limit
+    ctrl.logged = logged
+    return ctrl
+
+
+def run_round(ctrl, clock, elapsed=1.0, seconds=1.0, size=MiB, failed=0, error=None):
+    # One full round: as many reports as the limit, the first `failed` failing
+    jobs = ctrl.limit
+    clock(elapsed)
+    for i in range(jobs):
+        if i < failed:
+            ctrl.report(False, seconds, 0, error)
+        else:
+            ctrl.report(True, seconds, size)
+    return ctrl.decisions[-1]
+
+
+def test_steady_round_adds_one(clock):
+    ctrl = controller()
+    assert ctrl.limit == ConcurrencyController.START == 2
+    assert run_round(ctrl, clock)["reason"] == "steady"
+    assert ctrl.limit == 3
+
+
+def test_no_decision_before_the_round_is_complete(clock):
+    ctrl = controller(limit=4)
+    for _ in range(3):
+        ctrl.report(True, 1.0, MiB)
+    assert ctrl.decisions == [] and ctrl.limit == 4
+
+
+def test_throttling_halves(clock):
+    ctrl = controller(limit=8)
+    decision = run_round(ctrl, clock, failed=1, error=RuntimeError("HTTP Error 429: Too Many Requests"))
+    assert decision["reason"] == "throttled or failing"
+    assert ctrl.limit == 4
+
+
+@pytest.mark.parametrize("failed, limit", [(3, 4), (2, 9)])
+def test_more_than_a_quarter_failing_halves(clock, failed, limit):
+    ctrl = controller(limit=8)
+    run_round(ctrl, clock, failed=failed, error=RuntimeError("HTTP Error 404: Not Found"))
+    assert ctrl.limit == limit
+
+
+def test_slower_round_backs_off_by_a_quarter(clock):
+    ctrl = controller(limit=8)
+    run_round(ctrl, clock, elapsed=1.0, seconds=1.0)
+    assert ctrl.limit == 9
+    # Same bytes per job, but the round took longer and each job did too
+    decision = run_round(ctrl, clock, elapsed=3.0, seconds=1.5)
+    assert decision["reason"] == "slower"
+    assert ctrl.limit == int(9 * ConcurrencyController.BACKOFF)
+
+
+def test_lower_throughput_alone_is_steady(clock):
+    ctrl = controller(limit=8)
+    run_round(ctrl, clock, elapsed=1.0, seconds=1.0)
+    assert run_round(ctrl, clock, elapsed=3.0, seconds=1.1)["reason"] == "steady"
+
+
+def test_clamped_to_minimum_and_maximum(clock):
+    low = controller(minimum=1, limit=1)
+    run_round(low, clock, failed=1, error=RuntimeError("HTTP Error 503"))
+    assert low.limit == 1
+    high = controller(maximum=3)
+    for _ in range(3):
+        run_round(high, clock)
+    assert high.limit == 3
+    assert ConcurrencyController(0, 2).limit == 2
+
+
+def test_decisions_are_logged(clock):
+    ctrl = controller()
+    run_round(ctrl, clock, elapsed=2.0, seconds=1.5, size=3 * MiB)
+    assert ctrl.decisions == [
+        {
+            "from": 2,
+            "to": 3,
+            "reason": "steady",
+            "throughput_bps": 3 * MiB,
+            "latency": 1.5,
+            "failed": 0,
+            "jobs": 2,
+        }
+    ]
+    assert ctrl.logged == ["⚙️  jobs 2 → 3 (steady): 3.00MiB/s, 1.5s per job, 0/2 failed"]
+
+
+def test_slots_respect_the_limit():
+    ctrl = controller(limit=2)
+    active, peak, lock = [0], [0], threading.Lock()
+
+    def job():
+        with ctrl.slot():
+            with lock:
+                active[0] += 1
+                peak[0] = max(peak[0], active[0])
+            time.sleep(0.05)
+            with lock:
+                active[0] -= 1
+
+    threads = [threading.Thread(target=job) for _ in range(6)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(5)
+    assert peak[0] == 2
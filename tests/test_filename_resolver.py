@@ -0,0 +1,119 @@
+import os
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+from yt_dlx_backend import FilenameResolver
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+def naive_auto_number(path: str) -> str:
+    # The probing loop auto_number used before the resolver
+    base, ext = os.path.splitext(path)
+    counter, candidate = 1, path
+    while os.path.exists(candidate):
+        candidate = f"{base} ({counter}){ext}"
+        counter += 1
+    return candidate
+
+
+def touch(path):
+    open(path, "wb").close()
+
+
+def test_free_name_is_returned_unchanged(tmp_path):
+    target = tmp_path / "Foo.mp4"
+    assert FilenameResolver().resolve(str(target)) == str(target)
+
+
+def test_next_suffix_after_highest(tmp_path):
+    for name in ("Foo.mp4", "Foo (1).mp4", "Foo (7).mp4", "Foo (2).webm"):
+        touch(tmp_path / name)
+    assert FilenameResolver().resolve(str(tmp_path / "Foo.mp4")) == str(tmp_path / "Foo (8).mp4")
+
+
+def test_requested_name_already_numbered(tmp_path):
+    # "Track (2019)" style titles used to loop forever
+    touch(tmp_path / "Foo (1).mp4")
+    resolver = FilenameResolver()
+    result = []
+    worker = threading.Thread(target=lambda: result.append(resolver.resolve(str(tmp_path / "Foo (1).mp4"))))
+    worker.daemon = True
+    worker.start()
+    worker.join(5)
+    assert result == [str(tmp_path / "Foo (1) (1).mp4")]
+    assert resolver.resolve(str(tmp_path / "Foo.mp4")) == str(tmp_path / "Foo.mp4")
+
+
+def test_names_handed_out_are_reserved(tmp_path):
+    touch(tmp_path / "Foo.mp4")
+    resolver = FilenameResolver()
+    first = resolver.resolve(str(tmp_path / "Foo.mp4"))
+    second = resolver.resolve(str(tmp_path / "Foo.mp4"))
+    assert {first, second} == {str(tmp_path / "Foo (1).mp4"), str(tmp_path / "Foo (2).mp4")}
+
+
+def test_outside_writer_is_not_overwritten(tmp_path):
+    touch(tmp_path / "Foo.mp4")
+    resolver = FilenameResolver()
+    assert resolver.resolve(str(tmp_path / "Foo.mp4")).endswith("Foo (1).mp4")
+    # Appears without a fresh scan noticing it (same directory mtime)
+    mtime = os.stat(tmp_path).st_mtime_ns
+    touch(tmp_path / "Foo (2).mp4")
+    os.utime(tmp_path, ns=(mtime, mtime))
+    assert resolver.resolve(str(tmp_path / "Foo.mp4")).endswith("Foo (3).mp4")
+
+
+def test_benchmark_10k_colliding_names(tmp_path, monkeypatch, capsys):
+    touch(tmp_path / "Song.mp4")
+    for n in range(1, 10_000):
+        touch(tmp_path / f"Song ({n}).mp4")
+    target = str(tmp_path / "Song.mp4")
+
+    started = time.perf_counter()
+    expected = naive_auto_number(target)
+    naive = time.perf_counter() - started
+
+    calls = []
+    real_exists = os.path.exists
+    monkeypatch.setattr(os.path, "exists", lambda p: calls.append(p) or real_exists(p))
+    started = time.perf_counter()
+    resolved = FilenameResolver().resolve(target)
+    indexed = time.perf_counter() - started
+
+    assert resolved == expected == str(tmp_path / "Song (10000).mp4")
+    # One directory scan plus a single confirming stat instead of 10k probes
+    assert len(calls) == 1
+    with capsys.disabled():
+        print(f"\n10k collisions: probing {naive * 1000:.1f} ms, indexed {indexed * 1000:.1f} ms")
+
+
+def test_claim_skips_a_file_created_behind_the_scan(tmp_path):
+    # Same directory mtime, so only the O_EXCL create can notice
+    resolver = FilenameResolver()
+    resolver.resolve(str(tmp_path / "Other.mp4"))
+    stat = os.stat(tmp_path)
+    touch(tmp_path / "Song.mp4")
+    os.utime(tmp_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    claimed = resolver.resolve(str(tmp_path / "Song.mp4"), claim=True)
+    assert claimed == str(tmp_path / "Song (1).mp4")
+    assert os.path.exists(claimed)
+
+
+def test_claims_are_unique_across_processes(tmp_path):
+    claim = (
+        "import sys, yt_dlx_backend\n"
+        "for _ in range(20):\n"
+        "    print(yt_dlx_backend.FilenameResolver().resolve(sys.argv[1], claim=True))\n"
+    )
+    target = str(tmp_path / "Song.mp4")
+    workers = [
+        subprocess.Popen([sys.executable, "-c", claim, target], cwd=ROOT, stdout=subprocess.PIPE, text=True)
+        for _ in range(4)
+    ]
+    claimed = [line for worker in workers for line in worker.communicate(timeout=60)[0].splitlines()]
+    assert len(claimed) == len(set(claimed)) == 80
+    assert sorted(os.listdir(tmp_path)) == sorted(os.path.basename(path) for path in claimed)
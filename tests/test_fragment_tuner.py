@@ -0,0 +1,98 @@
+import pytest
+
+from yt_dlx_backend import FragmentTuner, YoutubeDLPool
+
+MiB = 2**20
+
+
+class Timer:
+    def __init__(self, rate, fragmented=True):
+        self.rate = rate
+        self.fragmented = fragmented
+
+    def throughput(self):
+        return self.rate
+
+
+def test_doubles_while_it_pays_off_then_steps_back():
+    tuner = FragmentTuner()
+    assert tuner.level() == 2
+    tuner.report(2, Timer(1 * MiB))
+    assert tuner.level() == 4
+    tuner.report(4, Timer(2 * MiB))
+    assert tuner.level() == 8
+    # Less than GAIN over half the level: back to 4 for good
+    tuner.report(8, Timer(2.1 * MiB))
+    assert tuner.level() == 4
+    tuner.report(4, Timer(3 * MiB))
+    assert tuner.level() == 4
+
+
+def test_stops_at_max():
+    tuner = FragmentTuner()
+    rate = 1 * MiB
+    for _ in range(10):
+        tuner.report(tuner.level(), Timer(rate))
+        rate *= 2
+    assert tuner.level() == FragmentTuner.MAX
+
+
+def test_throttling_error_halves_and_lowers_the_ceiling():
+    tuner = FragmentTuner()
+    tuner.report(2, Timer(1 * MiB))
+    tuner.report(4, Timer(2 * MiB))
+    tuner.report(8, None, RuntimeError("ERROR: unable to download video data: HTTP Error 429: Too Many Requests"))
+    assert tuner.level() == 4
+    # The ceiling is now 7, so 8 is never tried again
+    tuner.report(4, Timer(8 * MiB))
+    assert tuner.level() == 4
+
+
+def test_retried_fragments_count_as_throttling():
+    # Fragment errors are retried and skipped, so nothing raises
+    tuner = FragmentTuner()
+    tuner.report(2, Timer(1 * MiB))
+    tuner.report(4, Timer(4 * MiB), throttled=3)
+    assert tuner.level() == 2
+
+
+@pytest.mark.parametrize(
+    "timer, error",
+    [(None, RuntimeError("HTTP Error 404: Not Found")), (Timer(1 * MiB, fragmented=False), None), (Timer(None), None)],
+)
+def test_other_outcomes_change_nothing(timer, error):
+    tuner = FragmentTuner()
+    tuner.report(2, timer, error)
+    assert tuner.level() == 2
+
+
+def test_stale_reports_only_record_their_rate():
+    tuner = FragmentTuner()
+    tuner.report(2, Timer(1 * MiB))
+    tuner.report(2, Timer(1 * MiB))  # started before the change to 4
+    assert tuner.level() == 4
+
+
+def test_listener_collects_throttled_retries():
+    throttled = []
+    listen = FragmentTuner().listener(throttled)
+    listen("[download] Got error: HTTP Error 503: Service Unavailable. Retrying fragment 12 (1/10)...")
+    listen("[download] Got error: HTTP Error 404: Not Found. Retrying fragment 3 (1/10)...")
+    listen("[download] Destination: HTTP Error 500.mp4")
+    assert len(throttled) == 1
+
+
+def test_pool_forwards_yt_dlp_retry_messages():
+    yt_dlp = pytest.importorskip("yt_dlp")
+    from yt_dlp.downloader.common import FileDownloader
+
+    pool = YoutubeDLPool()
+    throttled = []
+    with pool.checkout({"quiet": True}, listeners=[FragmentTuner().listener(throttled)]) as ydl:
+        downloader = FileDownloader(ydl, ydl.params)
+        error = yt_dlp.utils.DownloadError("HTTP Error 503: Service Unavailable")
+        downloader.report_retry(error, 1, 10, frag_index=7, fatal=False)
+    # Not forwarded once the checkout is over
+    ydl.to_screen("[download] Got error: HTTP Error 503")
+    pool.close()
+    assert len(throttled) == 1
@@ -0,0 +1,131 @@
+import os
+import statistics
+import time
+from pathlib import Path
+
+import pytest
+
+import yt_dlx_backend
+from yt_dlx_backend import parse_search_page
+
+FIXTURES = Path(__file__).parent / "fixtures"
+
+
+def fixture(name: str) -> str:
+    return (FIXTURES / name).read_text(encoding="utf-8")
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+@pytest.fixture
+def served(monkeypatch):
+    # Serves a fixture in place of the results page and records fallbacks
+    fallbacks = []
+    page = {}
+
+    class Session:
+        def get(self, url, params=None, timeout=None):
+            return FakeResponse(page["html"])
+
+    def ytdlp_backend(query, max_results):
+        fallbacks.append(query)
+        return [{"title": "from yt-dlp", "url": "https://www.youtube.com/watch?v=fallback000"}]
+
+    monkeypatch.setattr(yt_dlx_backend, "_http_session", lambda: Session())
+    monkeypatch.setattr(yt_dlx_backend, "_ytdlp_backend", ytdlp_backend)
+
+    def serve(html):
+        page["html"] = html
+        return fallbacks
+
+    return serve
+
+
+def test_empty_parse_falls_back_to_ytdlp(served, monkeypatch):
+    fallbacks = served("<html></html>")
+    monkeypatch.setattr(yt_dlx_backend, "parse_search_page", lambda html, n: [])
+    videos = yt_dlx_backend._html_backend("song", 5)
+    assert fallbacks == ["song"]
+    assert videos[0]["title"] == "from yt-dlp"
+
+
+@pytest.mark.parametrize("name", ["search_results.html", "search_results_window.html"])
+def test_parses_recorded_results_page(name):
+    pytest.importorskip("bs4")
+    videos = parse_search_page(fixture(name), 10)
+    # Ads and Shorts are skipped; shelves nested in the results are not
+    assert [v["url"].rsplit("=", 1)[1] for v in videos] == [
+        "dQw4w9WgXcQ",
+        "yPYZpwSpKmA",
+        "IO9XlQrEt2Y",
+        "AyOqGRjVtls",
+        "ZdX4JIHfOLc",
+    ]
+    first, live = videos[0], videos[2]
+    assert first["title"] == "Rick Astley - Never Gonna Give You Up (Official Music Video)"
+    assert first["duration"] == 213.0
+    assert first["channel"] == "Rick Astley"
+    assert first["view_count"] == 1634567890
+    assert live["duration"] == 3845.0
+    assert len(parse_search_page(fixture(name), 2)) == 2
+
+
+def test_consent_page_is_a_parse_failure():
+    pytest.importorskip("bs4")
+    with pytest.raises(ValueError):
+        parse_search_page(fixture("consent.html"), 5)
+
+
+@pytest.mark.parametrize("name", ["consent.html", "search_no_results.html"])
+def test_unusable_pages_fall_back_to_ytdlp(served, name):
+    pytest.importorskip("bs4")
+    fallbacks = served(fixture(name))
+    assert [v["title"] for v in yt_dlx_backend._html_backend("song", 5)] == ["from yt-dlp"]
+    assert fallbacks == ["song"]
+
+
+def test_recorded_page_is_served_without_fallback(served):
+    pytest.importorskip("bs4")
+    fallbacks = served(fixture("search_results.html"))
+    assert len(yt_dlx_backend._html_backend("rick astley", 3)) == 3
+    assert fallbacks == []
+
+
+def test_benchmark_parse_cpu(capsys):
+    pytest.importorskip("bs4")
+    html = fixture("search_results.html")
+    runs = 200
+    started = time.process_time()
+    for _ in range(runs):
+        parse_search_page(html, 20)
+    per_page = (time.process_time() - started) / runs
+    with capsys.disabled():
+        print(f"\nhtml parse: {per_page * 1000:.2f} ms CPU per results page")
+
+
+@pytest.mark.skipif(not os.environ.get("YTDLX_LIVE_BENCH"), reason="set YTDLX_LIVE_BENCH=1 to search YouTube")
+def test_benchmark_against_ytdlp(capsys):
+    # Live comparison of both engines on the same queries: wall time and
+    # process CPU per search, medians after one warm-up call each
+    for module in ("bs4", "requests", "yt_dlp"):
+        pytest.importorskip(module)
+    queries = ["rick astley never gonna give you up", "daft punk around the world", "lofi hip hop", "c# tutorial"]
+    engines = {"html": yt_dlx_backend._html_backend, "ytdlp": yt_dlx_backend._ytdlp_backend}
+    report = []
+    for name, engine in engines.items():
+        engine(queries[0], 10)
+        wall, cpu = [], []
+        for query in queries:
+            started, started_cpu = time.perf_counter(), time.process_time()
+            assert engine(query, 10)
+            wall.append(time.perf_counter() - started)
+            cpu.append(time.process_time() - started_cpu)
+        report.append(f"{name:>5}: {statistics.median(wall) * 1000:7.1f} ms wall, {statistics.median(cpu) * 1000:6.1f} ms CPU")
+    with capsys.disabled():
+        print("\n" + "\n".join(report))
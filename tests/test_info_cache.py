@@ -0,0 +1,67 @@
+import copy
+import time
+
+import pytest
+
+from yt_dlx_backend import InfoCache
+
+
+def raw_info(expire):
+    # Trimmed extract_info(process=False) result for a YouTube video with a
+    # possibly damaged av01 format next to a good avc1 one
+    def video(format_id, vcodec, source_preference):
+        return {
+            "format_id": format_id,
+            "url": f"https://rr1.googlevideo.com/videoplayback?expire={expire}&itag={format_id}",
+            "ext": "mp4",
+            "protocol": "https",
+            "width": 1920,
+            "height": 1080,
+            "fps": 30,
+            "vcodec": vcodec,
+            "acodec": "none",
+            "tbr": 2500,
+            "source_preference": source_preference,
+        }
+
+    return {
+        "_type": "video",
+        "id": "dQw4w9WgXcQ",
+        "title": "Never Gonna Give You Up",
+        "duration": 213,
+        "extractor": "youtube",
+        "extractor_key": "Youtube",
+        "webpage_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "original_url": "https://www.youtube.com/watch?v=dQw4w9WgXcQ",
+        "formats": [video("damaged", "av01.0.08M.08", -10), video("good", "avc1.640028", 0)],
+        "_format_sort_fields": ("quality", "res", "fps", "hdr:12", "source", "vcodec", "channels", "acodec", "lang", "proto"),
+        "automatic_captions": {"en": [{"ext": "vtt", "url": "https://example.com/captions"}]},
+    }
+
+
+@pytest.fixture
+def cache(tmp_path):
+    store = InfoCache(str(tmp_path / "info.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_put_drops_only_bulky_keys(cache):
+    info = raw_info(int(time.time()) + 6 * 3600)
+    cache.put(info)
+    cached = cache.get(info["id"])
+    assert "automatic_captions" not in cached
+    assert cached["_format_sort_fields"] == list(info["_format_sort_fields"])
+    assert cached["formats"] == info["formats"]
+
+
+def test_cached_replay_selects_the_same_format(cache):
+    yt_dlp = pytest.importorskip("yt_dlp")
+    info = raw_info(int(time.time()) + 6 * 3600)
+    opts = {"quiet": True, "simulate": True, "format": "bv"}
+    with yt_dlp.YoutubeDL(opts) as ydl:
+        fresh = ydl.process_ie_result(copy.deepcopy(info), download=False)
+        cache.put(ydl.sanitize_info(copy.deepcopy(info), remove_private_keys=True))
+        replayed = ydl.process_ie_result(cache.get(info["id"]), download=False)
+    assert fresh["format_id"] == "good"
+    assert replayed["format_id"] == fresh["format_id"]
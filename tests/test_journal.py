@@ -0,0 +1,57 @@
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+from yt_dlx_backend import JobJournal
+
+ROOT = Path(__file__).resolve().parents[1]
+WRITER = textwrap.dedent(
+    """
+    import sys
+    from yt_dlx_backend import JobJournal
+
+    journal = JobJournal(sys.argv[1])
+    name = sys.argv[2]
+    for i in range(int(sys.argv[3])):
+        journal.record(f"{name}-{i}", "queued", sync=False, query=f"{name} {i}")
+        if i % 10 == 0:
+            journal.compact()
+    journal.close()
+    """
+)
+
+
+def test_concurrent_appends_survive_compaction(tmp_path):
+    # Compaction replaces the file; appends from other processes used to
+    # land in the replaced copy and disappear
+    path = str(tmp_path / "journal.jsonl")
+    writers = [
+        subprocess.Popen([sys.executable, "-c", WRITER, path, f"w{n}", "200"], cwd=ROOT)
+        for n in range(4)
+    ]
+    for writer in writers:
+        assert writer.wait(60) == 0
+
+    jobs = {job["job"] for job in JobJournal(path).pending()}
+    assert jobs == {f"w{n}-{i}" for n in range(4) for i in range(200)}
+
+
+def test_pending_skips_jobs_owned_by_live_processes(tmp_path):
+    journal = JobJournal(str(tmp_path / "journal.jsonl"))
+    journal.record("mine", "downloading")
+    journal.record("gone", "downloading")
+    journal.record("finished", "done")
+    journal.close()
+
+    owner = subprocess.Popen([sys.executable, "-c", "import time; time.sleep(30)"])
+    dead = subprocess.Popen([sys.executable, "-c", "pass"])
+    dead.wait()
+    try:
+        with open(journal.path, "a", encoding="utf-8") as f:
+            f.write(f'{{"job": "busy", "phase": "downloading", "pid": {owner.pid}}}\n')
+            f.write(f'{{"job": "gone", "phase": "downloading", "pid": {dead.pid}}}\n')
+        assert sorted(job["job"] for job in journal.pending()) == ["gone", "mine"]
+    finally:
+        owner.kill()
+        owner.wait()
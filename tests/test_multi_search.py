@@ -0,0 +1,81 @@
+import time
+
+import pytest
+
+import yt_dlx_backend
+from yt_dlx_backend import multi_search
+
+
+def video(vid, source):
+    return {"title": f"{vid} via {source}", "url": f"https://www.youtube.com/watch?v={vid}"}
+
+
+@pytest.fixture
+def backends(monkeypatch):
+    # Registers stub backends: name -> (delay, video IDs) or an exception
+    def register(**stubs):
+        for name, stub in stubs.items():
+
+            def search(query, max_results, name=name, stub=stub):
+                if isinstance(stub, Exception):
+                    raise stub
+                delay, ids = stub
+                time.sleep(delay)
+                return [video(vid, name) for vid in ids][:max_results]
+
+            monkeypatch.setitem(yt_dlx_backend.SEARCH_BACKENDS, name, (search, 5.0))
+
+    return register
+
+
+def test_merges_in_backend_priority_order(backends):
+    # The faster backend answers first but the order given decides
+    backends(slow=(0.2, ["aaaaaaaaaaa", "bbbbbbbbbbb"]), fast=(0, ["ccccccccccc", "ddddddddddd"]))
+    titles = [v["title"] for v in multi_search("q", 10, ["slow", "fast"])]
+    assert titles == ["aaaaaaaaaaa via slow", "bbbbbbbbbbb via slow", "ccccccccccc via fast", "ddddddddddd via fast"]
+
+
+def test_dedupes_by_video_id(backends):
+    backends(one=(0, ["aaaaaaaaaaa", "bbbbbbbbbbb"]), two=(0, ["bbbbbbbbbbb", "ccccccccccc"]))
+    results = multi_search("q", 10, ["one", "two"])
+    assert [v["title"] for v in results] == ["aaaaaaaaaaa via one", "bbbbbbbbbbb via one", "ccccccccccc via two"]
+
+
+def test_truncates_to_max_results(backends):
+    backends(one=(0, ["aaaaaaaaaaa", "bbbbbbbbbbb"]), two=(0, ["ccccccccccc"]))
+    assert len(multi_search("q", 2, ["one", "two"])) == 2
+
+
+def test_slow_backend_times_out(backends, capsys):
+    backends(hung=(2.0, ["aaaaaaaaaaa"]), quick=(0, ["bbbbbbbbbbb"]))
+    started = time.monotonic()
+    results = multi_search("q", 10, ["hung", "quick"], timeout=0.3)
+    assert time.monotonic() - started < 1.0
+    assert [v["title"] for v in results] == ["bbbbbbbbbbb via quick"]
+    assert "hung timed out" in capsys.readouterr().err
+
+
+def test_failing_backend_is_skipped(backends, capsys):
+    backends(broken=RuntimeError("no key"), quick=(0, ["bbbbbbbbbbb"]))
+    assert [v["title"] for v in multi_search("q", 10, ["broken", "quick"])] == ["bbbbbbbbbbb via quick"]
+    assert "broken failed: no key" in capsys.readouterr().err
+
+
+def test_first_n_returns_early(backends):
+    backends(slow=(2.0, ["aaaaaaaaaaa"]), fast=(0, ["bbbbbbbbbbb", "ccccccccccc", "ddddddddddd"]))
+    started = time.monotonic()
+    results = multi_search("q", 10, ["slow", "fast"], first_n=2)
+    assert time.monotonic() - started < 1.0
+    # Arrival order, not priority order
+    assert [v["title"] for v in results] == ["bbbbbbbbbbb via fast", "ccccccccccc via fast", "ddddddddddd via fast"]
+
+
+def test_first_n_waits_for_enough_results(backends):
+    backends(slow=(0.3, ["aaaaaaaaaaa"]), fast=(0, ["bbbbbbbbbbb"]))
+    results = multi_search("q", 10, ["slow", "fast"], first_n=2)
+    assert {v["title"] for v in results} == {"aaaaaaaaaaa via slow", "bbbbbbbbbbb via fast"}
+
+
+def test_unknown_backend():
+    with pytest.raises(ValueError, match="nope"):
+        multi_search("q", 5, ["nope"])
@@ -0,0 +1,37 @@
+from yt_dlx_backend import ResultRanker, audio_query, normalize_query
+
+
+def test_separators_collapse():
+    assert normalize_query("Artist - Song") == "artist song"
+    assert normalize_query("  artist  -  song ") == "artist song"
+    assert normalize_query("Artist — Song") == "artist song"
+    assert normalize_query("ARTIST SONG") == "artist song"
+
+
+def test_meaningful_symbols_are_kept():
+    keys = {normalize_query(q) for q in ("C# tutorial", "C++ tutorial", "C tutorial")}
+    assert len(keys) == 3
+
+
+def test_symbol_only_queries_keep_a_key():
+    assert normalize_query("🎵🎶") == "🎵🎶"
+    assert normalize_query("🎵🎶") != normalize_query("🔥")
+    assert normalize_query("---") == "---"
+
+
+def test_audio_key_keeps_symbols():
+    assert normalize_query("C# tutorial", audio=True) == "c# tutorial audio"
+
+
+def test_audio_suffix_added_once():
+    assert normalize_query("song audio", audio=True) == "song audio"
+    assert normalize_query("Song   Audio") == "song audio"
+    assert audio_query("song audio", True) == "song audio"
+    assert audio_query("song", True) == "song audio"
+
+
+def test_ranker_still_matches_words_in_decorated_titles():
+    ranker = ResultRanker("Artist - Song", audio=True)
+    plain = ranker.score({"title": "Other thing", "channel": "Someone"})
+    decorated = ranker.score({"title": "Song (Official Audio)", "channel": "Artist - Topic"})
+    assert decorated > plain
@@ -0,0 +1,87 @@
+import time
+from contextlib import contextmanager
+
+import pytest
+
+import yt_dlx_backend
+from yt_dlx_backend import FetchOptions, InfoCache, InfoPrefetcher
+
+URLS = [f"https://www.youtube.com/watch?v=video{i:06d}" for i in range(4)]
+
+
+@pytest.fixture
+def extracted(monkeypatch):
+    calls = []
+
+    def extract(self, url):
+        calls.append(url)
+        time.sleep(0.2)
+        return {"webpage_url": url}
+
+    monkeypatch.setattr(InfoPrefetcher, "MAX_WORKERS", 1)
+    monkeypatch.setattr(InfoPrefetcher, "_extract", extract)
+    return calls
+
+
+def test_take_waits_for_a_running_extraction(extracted):
+    prefetcher = InfoPrefetcher(FetchOptions(), URLS)
+    assert prefetcher.take(URLS[0]) == {"webpage_url": URLS[0]}
+    assert extracted == [URLS[0]]
+
+
+def test_take_runs_a_queued_pick_instead_of_cancelling_it(extracted):
+    # The pick was still queued behind other prefetches; closing the pool
+    # used to cancel it and take() returned nothing
+    prefetcher = InfoPrefetcher(FetchOptions(), URLS)
+    started = time.monotonic()
+    assert prefetcher.take(URLS[3]) == {"webpage_url": URLS[3]}
+    # Not after the two queued in front of it
+    assert time.monotonic() - started < 0.35
+    assert URLS[1] not in extracted
+
+
+def test_take_unknown_url_closes(extracted):
+    prefetcher = InfoPrefetcher(FetchOptions(), URLS[:1])
+    assert prefetcher.take(URLS[2]) is None
+    prefetcher.add(URLS[2])  # ignored once closed
+    assert URLS[2] not in extracted
+
+
+class FakeYDL:
+    def extract_info(self, url, download=True, process=True):
+        return {
+            "_type": "video",
+            "id": url.rsplit("=", 1)[1],
+            "original_url": url,
+            "formats": [{"format_id": "hls", "url": "https://example.com/hls.m3u8", "__needs_testing": True}],
+        }
+
+    @staticmethod
+    def sanitize_info(info, remove_private_keys=False):
+        # Like yt-dlp's: a filtered copy without the private keys
+        def clean(obj):
+            if isinstance(obj, dict):
+                return {k: clean(v) for k, v in obj.items() if not k.startswith("__") and k != "original_url"}
+            if isinstance(obj, list):
+                return [clean(v) for v in obj]
+            return obj
+
+        return clean(info)
+
+
+def test_take_returns_the_raw_extraction_and_caches_a_sanitised_copy(monkeypatch, tmp_path):
+    class Pool:
+        @contextmanager
+        def checkout(self, opts, progress_hooks=()):
+            yield FakeYDL()
+
+    cache = InfoCache(str(tmp_path / "info.sqlite3"))
+    monkeypatch.setattr(yt_dlx_backend, "YDL_POOL", Pool())
+    monkeypatch.setattr(yt_dlx_backend, "INFO_CACHE", cache)
+    info = InfoPrefetcher(FetchOptions(), URLS[:1]).take(URLS[0])
+    # process_ie_result needs these to test flagged formats before picking them
+    assert info["original_url"] == URLS[0]
+    assert info["formats"][0]["__needs_testing"] is True
+    cached = cache.get("video000000")
+    assert "original_url" not in cached and "__needs_testing" not in cached["formats"][0]
+    cache.close()
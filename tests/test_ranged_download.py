@@ -0,0 +1,168 @@
+import http.server
+import os
+import threading
+import time
+
+import pytest
+
+pytest.importorskip("requests")
+
+from yt_dlx_backend import RangedDownloader, RangedDownloadError
+
+CHUNK = 256 * 2**10
+DATA = os.urandom(8 * CHUNK + 123)
+
+
+class RangeServer(http.server.ThreadingHTTPServer):
+    # Serves DATA by byte range at `rate` bytes per second per connection,
+    # the way YouTube throttles, answering 503 to the first `failures[start]`
+    # requests for a range starting at `start`
+    daemon_threads = True
+
+    def __init__(self, rate: float):
+        super().__init__(("127.0.0.1", 0), RangeHandler)
+        self.rate = rate
+        self.failures = {}
+        self.served_503 = 0
+        self.served_bytes = 0
+        self.lock = threading.Lock()
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}/video"
+
+
+class RangeHandler(http.server.BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", str(len(DATA)))
+        self.end_headers()
+
+    def do_GET(self):
+        start, end = (int(n) for n in self.headers["Range"].split("=")[1].split("-"))
+        with self.server.lock:
+            fail = self.server.failures.get(start, 0)
+            if fail:
+                self.server.failures[start] = fail - 1
+                self.server.served_503 += 1
+        if fail:
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = DATA[start : end + 1]
+        with self.server.lock:
+            self.server.served_bytes += len(body)
+        self.send_response(206)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(DATA)}")
+        self.end_headers()
+        step = 32 * 2**10
+        for i in range(0, len(body), step):
+            self.wfile.write(body[i : i + step])
+            time.sleep(step / self.server.rate)
+
+
+@pytest.fixture
+def server(monkeypatch):
+    monkeypatch.setattr(RangedDownloader, "CHUNK_SIZE", CHUNK)
+    monkeypatch.setattr(RangedDownloader, "HOOK_INTERVAL", 0)
+    srv = RangeServer(rate=4 * 2**20)
+    threading.Thread(target=srv.serve_forever, daemon=True).start()
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def test_probe_size(server):
+    assert RangedDownloader.probe_size(server.url) == len(DATA)
+
+
+def test_failed_chunks_are_retried(server, tmp_path):
+    server.failures = {0: 1, 3 * CHUNK: 1}
+    path = str(tmp_path / "video.mp4")
+    seen = []
+
+    def hook(d):
+        seen.append((d["status"], d["tmpfilename"], os.path.exists(d["tmpfilename"])))
+
+    assert RangedDownloader(server.url, len(DATA), path, 4, progress_hooks=[hook]).download() == path
+    assert server.served_503 == 2
+    with open(path, "rb") as f:
+        assert f.read() == DATA
+    assert not os.path.exists(path + ".ranged.part")
+    # Hooks name the part file that is actually being written
+    assert {tmp for _, tmp, _ in seen} == {path + ".ranged.part"}
+    assert all(exists for _, _, exists in seen)
+    assert seen[-1][0] == "finished"
+
+
+def test_gives_up_after_retries(server, tmp_path, monkeypatch):
+    monkeypatch.setattr(RangedDownloader, "RETRIES", 1)
+    server.failures = {2 * CHUNK: 5}
+    path = str(tmp_path / "video.mp4")
+    with pytest.raises(RangedDownloadError, match="HTTP 503"):
+        RangedDownloader(server.url, len(DATA), path, 4).download()
+    assert not os.path.exists(path)
+    assert not os.path.exists(path + ".ranged.part")
+
+
+def test_connections_beat_per_connection_throttling(server, tmp_path, capsys):
+    timings = {}
+    for connections in (1, 4):
+        path = str(tmp_path / f"video-{connections}.mp4")
+        started = time.perf_counter()
+        RangedDownloader(server.url, len(DATA), path, connections).download()
+        timings[connections] = time.perf_counter() - started
+    with capsys.disabled():
+        print(f"\nthrottled range server: 1 connection {timings[1]:.2f} s, 4 connections {timings[4]:.2f} s")
+    assert timings[4] * 2 < timings[1]
+
+
+class Interrupted(Exception):
+    pass
+
+
+def test_interrupted_download_resumes_finished_chunks(server, tmp_path):
+    path = str(tmp_path / "video.mp4")
+
+    def interrupt(d):
+        if d["downloaded_bytes"] >= 4 * CHUNK:
+            raise Interrupted()
+
+    with pytest.raises(Interrupted):
+        RangedDownloader(server.url, len(DATA), path, 2, progress_hooks=[interrupt]).download()
+    # Left for --resume, with the finished chunks listed
+    assert os.path.getsize(path + ".ranged.part") == len(DATA)
+    with open(path + ".ranged.state") as f:
+        finished = [int(line) for line in f.readlines()[1:]]
+    assert finished and all(start % CHUNK == 0 for start in finished)
+
+    server.served_bytes = 0
+    progress = []
+    hooks = [lambda d: progress.append(d["downloaded_bytes"])]
+    assert RangedDownloader(server.url, len(DATA), path, 2, progress_hooks=hooks).download() == path
+    with open(path, "rb") as f:
+        assert f.read() == DATA
+    assert server.served_bytes == len(DATA) - len(finished) * CHUNK
+    # Progress counts the resumed chunks from the start
+    assert progress[0] >= len(finished) * CHUNK
+    assert not os.path.exists(path + ".ranged.part")
+    assert not os.path.exists(path + ".ranged.state")
+
+
+def test_part_file_for_another_download_is_not_resumed(server, tmp_path):
+    path = str(tmp_path / "video.mp4")
+    with open(path + ".ranged.part", "wb") as f:
+        f.write(b"\0" * len(DATA))
+    with open(path + ".ranged.state", "w") as f:
+        f.write('{"size": 1, "chunk": 1}\n0\n')
+    RangedDownloader(server.url, len(DATA), path, 4).download()
+    with open(path, "rb") as f:
+        assert f.read() == DATA
+    assert server.served_bytes == len(DATA)
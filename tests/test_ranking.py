@@ -0,0 +1,90 @@
+import pytest
+
+from yt_dlx_backend import ResultRanker, parse_duration
+
+
+def entry(title, channel=None, duration=None, views=None):
+    return {"title": title, "url": f"https://example.com/{title}", "channel": channel, "duration": duration, "view_count": views}
+
+
+def titles(entries):
+    return [e["title"] for e in entries]
+
+
+@pytest.mark.parametrize(
+    "value, seconds",
+    [(245, 245.0), ("245", 245.0), ("4:05", 245.0), ("1:04:05", 3845.0), (None, None), ("live", None), (True, None)],
+)
+def test_parse_duration(value, seconds):
+    assert parse_duration(value) == seconds
+
+
+def test_audio_prefers_official_audio_over_covers():
+    ranker = ResultRanker("Artist - Song", audio=True)
+    ranked = ranker.rank(
+        [
+            entry("Song (Karaoke Version)", "Karaoke Hits"),
+            entry("Artist - Song (Official Video)", "Artist"),
+            entry("Artist - Song (Official Audio)", "Artist"),
+        ]
+    )
+    assert titles(ranked) == [
+        "Artist - Song (Official Audio)",
+        "Artist - Song (Official Video)",
+        "Song (Karaoke Version)",
+    ]
+
+
+def test_video_prefers_official_video():
+    ranker = ResultRanker("Artist Song")
+    best = ranker.best([entry("Artist - Song (Lyrics)"), entry("Artist - Song (Official Video)")])
+    assert best["title"] == "Artist - Song (Official Video)"
+
+
+def test_unwanted_words_count_when_asked_for():
+    covers = [entry("Artist - Song"), entry("Artist - Song (Acoustic Cover)")]
+    assert ResultRanker("artist song").best(covers)["title"] == "Artist - Song"
+    assert ResultRanker("artist song cover").best(covers)["title"] == "Artist - Song (Acoustic Cover)"
+
+
+def test_audio_suffix_in_the_query_means_audio():
+    ranker = ResultRanker("artist song audio")
+    assert ranker.audio
+    assert "audio" not in ranker.tokens
+
+
+def test_topic_channels_match_the_artist():
+    ranker = ResultRanker("Artist Song", audio=True)
+    best = ranker.best([entry("Song", "Someone Else"), entry("Song", "Artist - Topic")])
+    assert best["channel"] == "Artist - Topic"
+
+
+def test_denied_channels_are_dropped_and_allowed_ones_preferred():
+    entries = [entry("Artist - Song", "Reupload Hub"), entry("Artist - Song", "ArtistVEVO")]
+    ranker = ResultRanker("artist song", allow_channels=["ArtistVEVO"], deny_channels=["reupload hub"])
+    assert [e["channel"] for e in ranker.rank(entries)] == ["ArtistVEVO"]
+    assert ResultRanker("x", deny_channels=["Reupload Hub"]).score(entries[0]) is None
+
+
+def test_target_duration():
+    ranker = ResultRanker("song", target_duration=200)
+    best = ranker.best([entry("song", duration=600), entry("song", duration="3:25"), entry("song", duration=60)])
+    assert best["duration"] == "3:25"
+
+
+def test_long_audio_is_penalised():
+    ranker = ResultRanker("song", audio=True)
+    assert ranker.best([entry("song", duration=3 * 3600), entry("song", duration=240)])["duration"] == 240
+
+
+def test_views_break_ties():
+    ranker = ResultRanker("song")
+    assert ranker.best([entry("song", views=10), entry("song", views=10**7)])["view_count"] == 10**7
+
+
+def test_missing_fields_and_ties_keep_search_order():
+    ranker = ResultRanker("song")
+    entries = [{"title": "song", "url": "a"}, {"title": "song", "url": "b"}, {"title": None, "url": "c"}]
+    assert [e["url"] for e in ranker.rank(entries)] == ["a", "b", "c"]
+    assert ranker.best(entries)["url"] == "a"
+    assert ranker.best([]) is None
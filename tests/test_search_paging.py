@@ -0,0 +1,90 @@
+import threading
+import time
+
+import pytest
+
+import yt_dlx_backend
+from yt_dlx_backend import FetchOptions, SearchPager, YouTubeFetcher
+
+
+def slow_search(delay=0.2, closed=None):
+    def iter_search(query, max_results=5, use_cache=True, refresh=False, options=None):
+        try:
+            for i in range(max_results):
+                time.sleep(delay)
+                yield {"title": f"{query} {i}", "url": f"https://www.youtube.com/watch?v=video{i:06d}"}
+        finally:
+            if closed is not None:
+                closed.append(threading.current_thread().name)
+
+    return iter_search
+
+
+@pytest.fixture
+def no_download(monkeypatch):
+    calls = []
+
+    def download_video(url, fmt, output_path, **kwargs):
+        calls.append(url)
+        return f"{output_path}/done.{fmt}"
+
+    monkeypatch.setattr(YouTubeFetcher, "download_video", staticmethod(download_video))
+    return calls
+
+
+def test_pick_while_results_stream_in(monkeypatch, no_download, tmp_path):
+    # Picking the first result while the producer is still inside next()
+    # used to close the generator from two threads
+    closed = []
+    monkeypatch.setattr(YouTubeFetcher, "iter_search", staticmethod(slow_search(closed=closed)))
+    first_shown = threading.Event()
+    monkeypatch.setattr(
+        "builtins.input", lambda prompt="": first_shown.wait(5) and time.sleep(0.05) or "1"
+    )
+    real_print = print
+    monkeypatch.setattr(
+        "builtins.print", lambda *a, **k: (first_shown.set(), real_print(*a, **k))
+    )
+
+    options = FetchOptions(use_cache=False, prefetch=False, results=5)
+    path = YouTubeFetcher.fetch("song", "mp4", str(tmp_path), options=options)
+
+    assert path == f"{tmp_path}/done.mp4"
+    assert no_download == ["https://www.youtube.com/watch?v=video000000"]
+    for _ in range(50):
+        if closed:
+            break
+        time.sleep(0.05)
+    assert len(closed) == 1 and closed[0] != threading.current_thread().name
+
+
+def test_pager_continues_where_the_last_page_stopped(monkeypatch):
+    monkeypatch.setattr(YouTubeFetcher, "iter_search", staticmethod(slow_search(delay=0)))
+    pager = SearchPager("song", FetchOptions(use_cache=False, results=2))
+    assert [v["title"] for v in pager.next_page()] == ["song 0", "song 1"]
+    assert [v["title"] for v in pager.next_page()] == ["song 2", "song 3"]
+    pager.close()
+
+
+def test_backend_pages_ask_for_one_page_at_a_time(monkeypatch):
+    # Non-default --backends used to ask every backend for page_size *
+    # MAX_PAGES results before the first page could be shown
+    asked = []
+
+    def stub(query, max_results):
+        asked.append(max_results)
+        return [
+            {"title": f"{query} {i}", "url": f"https://www.youtube.com/watch?v=video{i:06d}"}
+            for i in range(min(max_results, 5))
+        ]
+
+    monkeypatch.setitem(yt_dlx_backend.SEARCH_BACKENDS, "stub", (stub, 5))
+    pager = SearchPager("song", FetchOptions(use_cache=False, results=2, backends=["stub"]))
+    assert [v["title"] for v in pager.next_page()] == ["song 0", "song 1"]
+    assert asked == [2]
+    assert [v["title"] for v in pager.next_page()] == ["song 2", "song 3"]
+    assert asked == [2, 4]
+    assert [v["title"] for v in pager.next_page()] == ["song 4"]
+    assert pager.next_page() == []
+    assert asked == [2, 4, 6]
+    pager.close()
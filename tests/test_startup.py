@@ -0,0 +1,35 @@
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parents[1]
+# Cumulative microseconds for "import yt_dlx_backend"; about 70 ms without
+# yt-dlp, which alone costs several hundred
+IMPORT_BUDGET_US = 200_000
+HEAVY = ("yt_dlp", "bs4", "requests", "ddgs", "tavily")
+
+PROBE = f"""
+import sys
+import yt_dlx_backend
+print(",".join(m for m in {HEAVY!r} if m in sys.modules))
+"""
+
+
+def test_import_time_budget():
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", PROBE], cwd=ROOT, capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip() == "", f"imported at startup: {result.stdout.strip()}"
+    # "import time: self [us] | cumulative | imported package"
+    lines = [line for line in result.stderr.splitlines() if line.rstrip().endswith("| yt_dlx_backend")]
+    cumulative = int(lines[-1].split("|")[1])
+    assert cumulative <= IMPORT_BUDGET_US, f"import took {cumulative / 1000:.0f} ms"
+
+
+def test_help_does_not_import_yt_dlp():
+    probe = "import runpy, sys; sys.argv = ['yt-dlx', '--help']\n"
+    probe += "try:\n    runpy.run_path('yt_dlx_backend.py', run_name='__main__')\nexcept SystemExit:\n    pass\n"
+    probe += f"print(','.join(m for m in {HEAVY!r} if m in sys.modules), file=sys.stderr)"
+    result = subprocess.run([sys.executable, "-c", probe], cwd=ROOT, capture_output=True, text=True)
+    assert "usage" in result.stdout.lower()
+    assert result.stderr.strip() == ""
@@ -0,0 +1,119 @@
+import os
+import subprocess
+from contextlib import contextmanager
+
+import pytest
+
+import yt_dlx_backend
+from yt_dlx_backend import FetchOptions, YouTubeFetcher
+
+VIDEO = {"format_id": "137", "protocol": "https", "ext": "mp4", "vcodec": "avc1.640028", "acodec": "none"}
+AUDIO_AAC = {"format_id": "140", "protocol": "https", "ext": "m4a", "vcodec": "none", "acodec": "mp4a.40.2"}
+AUDIO_OPUS = {"format_id": "251", "protocol": "https", "ext": "webm", "vcodec": "none", "acodec": "opus"}
+
+
+def fmt(base, **extra):
+    return {**base, "url": f"https://rr1.googlevideo.com/videoplayback?itag={base['format_id']}", **extra}
+
+
+@pytest.fixture
+def ffmpeg(monkeypatch, tmp_path):
+    # Selects `selected` in place of yt-dlp and records the ffmpeg command
+    # instead of running it; returncode is what the fake ffmpeg exits with
+    state = {"selected": None, "returncode": 0, "commands": []}
+
+    class YDL:
+        def process_ie_result(self, info, download=True):
+            return state["selected"]
+
+    class Pool:
+        @contextmanager
+        def checkout(self, opts, progress_hooks=(), listeners=()):
+            yield YDL()
+
+    def run(cmd, stdout=None, **kwargs):
+        state["commands"].append(cmd)
+        return subprocess.CompletedProcess(cmd, state["returncode"])
+
+    monkeypatch.setattr(yt_dlx_backend, "YDL_POOL", Pool())
+    monkeypatch.setattr(yt_dlx_backend.shutil, "which", lambda name: f"/usr/bin/{name}")
+    monkeypatch.setattr(subprocess, "run", run)
+    return state
+
+
+def stream(fmt_name, sink):
+    info = {"id": "dQw4w9WgXcQ", "title": "Song"}
+    return YouTubeFetcher.stream_video(
+        "https://www.youtube.com/watch?v=dQw4w9WgXcQ", fmt_name, FetchOptions(use_cache=False), info=info, sink=sink
+    )
+
+
+def test_merge_maps_video_and_audio(ffmpeg, tmp_path):
+    ffmpeg["selected"] = {"title": "Song", "requested_formats": [fmt(VIDEO), fmt(AUDIO_AAC)]}
+    with open(tmp_path / "out", "wb") as sink:
+        assert stream("mp4", sink) == "-"
+    (cmd,) = ffmpeg["commands"]
+    assert cmd[0] == "/usr/bin/ffmpeg"
+    assert [cmd[i + 1] for i, arg in enumerate(cmd) if arg == "-i"] == [fmt(VIDEO)["url"], fmt(AUDIO_AAC)["url"]]
+    assert cmd[cmd.index("-map") :][:4] == ["-map", "0:v:0", "-map", "1:a:0"]
+    assert cmd[-7:] == ["-c", "copy", "-f", "mp4", "-movflags", "frag_keyframe+empty_moov", "pipe:1"]
+
+
+@pytest.mark.parametrize(
+    "fmt_name, source, expected",
+    [
+        # A matching m4a would be copied through requests; HLS needs ffmpeg
+        (
+            "m4a",
+            {**AUDIO_AAC, "protocol": "m3u8_native"},
+            ["-vn", "-c:a", "copy", "-f", "ipod", "-movflags", "frag_keyframe+empty_moov", "pipe:1"],
+        ),
+        ("opus", AUDIO_OPUS, ["-vn", "-c:a", "copy", "-f", "opus", "pipe:1"]),
+        ("opus", AUDIO_AAC, ["-vn", "-c:a", "libopus", "-b:a", "192k", "-f", "opus", "pipe:1"]),
+        ("mp3", AUDIO_OPUS, ["-vn", "-c:a", "libmp3lame", "-b:a", "192k", "-f", "mp3", "pipe:1"]),
+    ],
+)
+def test_audio_is_copied_only_when_the_codec_matches(ffmpeg, tmp_path, fmt_name, source, expected):
+    ffmpeg["selected"] = {"title": "Song", **fmt(source)}
+    with open(tmp_path / "out", "wb") as sink:
+        stream(fmt_name, sink)
+    (cmd,) = ffmpeg["commands"]
+    assert "-map" not in cmd
+    assert cmd[cmd.index("-vn") :] == expected
+
+
+def test_headers_are_passed_per_input(ffmpeg, tmp_path):
+    headers = {"User-Agent": "yt-dlx", "Referer": "https://www.youtube.com/"}
+    ffmpeg["selected"] = {"title": "Song", **fmt(AUDIO_OPUS, http_headers=headers)}
+    with open(tmp_path / "out", "wb") as sink:
+        stream("mp3", sink)
+    (cmd,) = ffmpeg["commands"]
+    assert cmd[cmd.index("-headers") + 1] == "User-Agent: yt-dlx\r\nReferer: https://www.youtube.com/\r\n"
+    assert cmd.index("-headers") < cmd.index("-i")
+
+
+def test_closed_reader_is_quiet(ffmpeg, capsys):
+    # ffmpeg fails on EPIPE once the reader closed the pipe
+    ffmpeg["selected"] = {"title": "Song", **fmt(AUDIO_OPUS)}
+    ffmpeg["returncode"] = 1
+    read, write = os.pipe()
+    os.close(read)
+    with os.fdopen(write, "wb") as sink:
+        assert stream("mp3", sink) == "-"
+    assert "Output closed by the reader" in capsys.readouterr().out
+
+
+def test_ffmpeg_killed_by_sigpipe_is_quiet(ffmpeg, tmp_path, capsys):
+    ffmpeg["selected"] = {"title": "Song", **fmt(AUDIO_OPUS)}
+    ffmpeg["returncode"] = -13
+    with open(tmp_path / "out", "wb") as sink:
+        assert stream("mp3", sink) == "-"
+    assert "Output closed by the reader" in capsys.readouterr().out
+
+
+def test_other_ffmpeg_failures_still_raise(ffmpeg, tmp_path):
+    ffmpeg["selected"] = {"title": "Song", **fmt(AUDIO_OPUS)}
+    ffmpeg["returncode"] = 1
+    with open(tmp_path / "out", "wb") as sink:
+        with pytest.raises(RuntimeError, match="ffmpeg exited with status 1"):
+            stream("mp3", sink)
@@ -1,10 +1,1954 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, asdict, field, replace
 from argparse import ArgumentParser
-from yt_dlp import YoutubeDL
-from typing import List, Dict
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, FIRST_EXCEPTION, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from typing import TYPE_CHECKING, Callable, List, Dict, Iterator, Optional
+import atexit
+import hashlib
+import itertools
+import json
+import math
 import os
 import sys
 import re
+import queue
+import shutil
+import threading
+import time
+import unicodedata
+
+# yt-dlp (and other heavy dependencies) are imported on first use so that
+# --help and argument errors don't pay for loading the extractor registry.
+if TYPE_CHECKING:
+    from yt_dlp import YoutubeDL
+
+
+# -----------------------------
+# YoutubeDL Instance Pool
+# -----------------------------
+class YoutubeDLPool:
+    # YoutubeDL objects are expensive to build (extractors, cookie jar, HTTP
+    # openers, postprocessors) and not thread-safe, so each checkout is
+    # exclusive and idle instances are handed back to the thread that last
+    # used them whenever possible.
+    def __init__(self, max_idle_per_key: int = 4, max_idle: int = 16):
+        self.max_idle_per_key = max_idle_per_key
+        self.max_idle = max_idle
+        self._lock = threading.Lock()
+        self._idle: "OrderedDict[str, List[tuple]]" = OrderedDict()
+        self._hooks: Dict[int, list] = {}
+        self._listeners: Dict[int, list] = {}
+
+    @staticmethod
+    def _key(opts: dict) -> str:
+        return json.dumps(opts, sort_keys=True, default=repr)
+
+    def _create(self, opts: dict) -> "YoutubeDL":
+        from yt_dlp import YoutubeDL
+
+        ydl = YoutubeDL(opts)
+        # Per-checkout hooks are routed through a single permanent hook, since
+        # YoutubeDL has no way to unregister one.
+        ydl.add_progress_hook(lambda d, ydl_id=id(ydl): self._dispatch(ydl_id, d))
+        # Likewise for screen messages, where downloaders report retries
+        # (even when quiet, which is checked further in)
+        to_screen = ydl.to_screen
+
+        def screen(message, *args, ydl_id=id(ydl), **kwargs):
+            for listener in self._listeners.get(ydl_id, ()):
+                listener(message)
+            return to_screen(message, *args, **kwargs)
+
+        ydl.to_screen = screen
+        return ydl
+
+    def _dispatch(self, ydl_id: int, d: dict):
+        for hook in self._hooks.get(ydl_id, ()):
+            hook(d)
+
+    def _detach(self, ydl: "YoutubeDL"):
+        self._hooks.pop(id(ydl), None)
+        self._listeners.pop(id(ydl), None)
+
+    def _close(self, ydl: "YoutubeDL"):
+        self._detach(ydl)
+        try:
+            ydl.close()
+        except Exception:
+            pass
+
+    def _acquire(self, key: str) -> Optional["YoutubeDL"]:
+        me = threading.get_ident()
+        with self._lock:
+            idle = self._idle.get(key)
+            if not idle:
+                return None
+            idx = next((i for i, (_, owner) in enumerate(idle) if owner == me), -1)
+            ydl, _ = idle.pop(idx)
+            if not idle:
+                del self._idle[key]
+            return ydl
+
+    def _release(self, key: str, ydl: "YoutubeDL"):
+        evicted = []
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            self._idle.move_to_end(key)
+            idle.append((ydl, threading.get_ident()))
+            if len(idle) > self.max_idle_per_key:
+                evicted.append(idle.pop(0)[0])
+            while sum(len(v) for v in self._idle.values()) > self.max_idle:
+                oldest_key, oldest = next(iter(self._idle.items()))
+                evicted.append(oldest.pop(0)[0])
+                if not oldest:
+                    del self._idle[oldest_key]
+        for old in evicted:
+            self._close(old)
+
+    @contextmanager
+    def checkout(self, opts: dict, progress_hooks=(), listeners=()) -> Iterator["YoutubeDL"]:
+        # listeners are called with every message yt-dlp sends to the screen
+        key = self._key(opts)
+        ydl = self._acquire(key) or self._create(opts)
+        self._hooks[id(ydl)] = list(progress_hooks)
+        self._listeners[id(ydl)] = list(listeners)
+        try:
+            yield ydl
+        except GeneratorExit:
+            # A lazy result (e.g. streamed search entries) was abandoned; the instance is fine
+            self._detach(ydl)
+            self._release(key, ydl)
+            raise
+        except BaseException:
+            # Don't hand a possibly half-broken instance to the next caller
+            self._close(ydl)
+            raise
+        self._detach(ydl)
+        self._release(key, ydl)
+
+    def close(self):
+        with self._lock:
+            idle = [ydl for entries in self._idle.values() for ydl, _ in entries]
+            self._idle.clear()
+        for ydl in idle:
+            self._close(ydl)
+
+
+YDL_POOL = YoutubeDLPool()
+atexit.register(YDL_POOL.close)
+
+
+# -----------------------------
+# On-disk Caches
+# -----------------------------
+def cache_dir() -> str:
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "yt-dlx")
+
+
+def data_dir() -> str:
+    base = os.environ.get("XDG_DATA_HOME") or os.path.expanduser("~/.local/share")
+    return os.path.join(base, "yt-dlx")
+
+
+def state_dir() -> str:
+    base = os.environ.get("XDG_STATE_HOME") or os.path.expanduser("~/.local/state")
+    return os.path.join(base, "yt-dlx")
+
+
+# -----------------------------
+# Query Normalisation
+# -----------------------------
+# Whitespace and dash runs ("Artist - Song", "Artist — Song"); other symbols
+# carry meaning ("C#" vs "C++") and are kept
+_SEPARATORS = re.compile(r"(?:\s|[-\u2010-\u2015\u2212])+")
+_WORDS = re.compile(r"[^\W_]+")
+_AUDIO_SUFFIX = re.compile(r"(?:\s+audio)+$")
+
+
+def normalize_query(query: str, audio: bool = False) -> str:
+    # Canonical form used for cache keys, coalescing and batch dedupe (never
+    # sent to YouTube): "Artist - Song", "artist  -  song" and "Artist Song"
+    # all collapse to "artist song", and the audio suffix ends up in one
+    # place whether it was typed or added by --audio.
+    folded = unicodedata.normalize("NFKC", query).casefold()
+    # Queries made only of separators still get a key of their own
+    text = _SEPARATORS.sub(" ", folded).strip() or folded.strip()
+    if _AUDIO_SUFFIX.search(text):
+        text, audio = _AUDIO_SUFFIX.sub("", text), True
+    return f"{text} audio" if audio and text else text
+
+
+def word_text(text: str) -> str:
+    # Words only, for matching titles and channel names where brackets and
+    # punctuation ("Song (Official Audio)") are decoration
+    return " ".join(_WORDS.findall(unicodedata.normalize("NFKC", text).casefold()))
+
+
+def audio_query(query: str, audio: bool) -> str:
+    # What is actually searched for with --audio: the suffix is added once,
+    # never doubled when the query already ends with it
+    if not audio or _AUDIO_SUFFIX.search(normalize_query(query)):
+        return query
+    return f"{query} audio"
+
+
+class SQLiteStore:
+    # One SQLite file can be shared by several tables; WAL lets concurrent
+    # processes (batch workers, the daemon, one-off CLI runs) read while
+    # another writes. Failures are never fatal, callers treat them as misses.
+    SCHEMA = ""
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(cache_dir(), "cache.sqlite3")
+        self._lock = threading.Lock()
+        self._conn = None
+        self._warned = False
+
+    def _db(self):
+        if self._conn is None:
+            import sqlite3
+
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            conn = sqlite3.connect(self.path, timeout=10, check_same_thread=False, isolation_level=None)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(self.SCHEMA)
+            self._conn = conn
+        return self._conn
+
+    def _run(self, fn):
+        import sqlite3
+
+        with self._lock:
+            try:
+                return fn(self._db())
+            except (sqlite3.Error, OSError) as e:
+                if not self._warned:
+                    self._warned = True
+                    print(f"⚠️  Cache unavailable ({self.path}): {e}", file=sys.stderr)
+                return None
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+class SearchCache(SQLiteStore):
+    DEFAULT_TTL: int = 7 * 24 * 3600
+    DEFAULT_MAX_ENTRIES: int = 10_000
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS search (
+            key TEXT PRIMARY KEY,
+            results TEXT NOT NULL,
+            created REAL NOT NULL,
+            accessed REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS search_accessed ON search (accessed);
+    """
+
+    def __init__(self, path: Optional[str] = None, ttl: int = DEFAULT_TTL, max_entries: int = DEFAULT_MAX_ENTRIES):
+        super().__init__(path)
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    @staticmethod
+    def key(query: str, max_results: int, source: str = "") -> str:
+        key = f"{normalize_query(query)}|{max_results}"
+        return f"{key}|{source}" if source else key
+
+    def get(self, query: str, max_results: int, source: str = "") -> Optional[List[Dict[str, str]]]:
+        key = self.key(query, max_results, source)
+        now = time.time()
+
+        def lookup(db):
+            row = db.execute("SELECT results, created FROM search WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if now - row[1] > self.ttl:
+                db.execute("DELETE FROM search WHERE key = ?", (key,))
+                return None
+            db.execute("UPDATE search SET accessed = ? WHERE key = ?", (now, key))
+            return json.loads(row[0])
+
+        return self._run(lookup)
+
+    def put(self, query: str, max_results: int, results: List[Dict[str, str]], source: str = ""):
+        now = time.time()
+
+        def store(db):
+            db.execute(
+                "INSERT OR REPLACE INTO search (key, results, created, accessed) VALUES (?, ?, ?, ?)",
+                (self.key(query, max_results, source), json.dumps(results), now, now),
+            )
+            db.execute("DELETE FROM search WHERE created < ?", (now - self.ttl,))
+            # Least recently used entries beyond the cap are evicted
+            db.execute(
+                "DELETE FROM search WHERE key IN (SELECT key FROM search ORDER BY accessed DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+        self._run(store)
+
+
+class InfoCache(SQLiteStore):
+    # Extracted info is only reusable while its signed format URLs are, so
+    # entries expire shortly before the earliest "expire=" timestamp.
+    DEFAULT_TTL: int = 3600
+    MAX_TTL: int = 5 * 3600
+    EXPIRY_MARGIN: int = 15 * 60
+    # Bulky and never needed to pick or download a format. Everything else
+    # is kept, since process_ie_result reads more than it seems to (e.g.
+    # _format_sort_fields, which ranks possibly damaged formats lower).
+    DROP_KEYS = {"automatic_captions", "heatmap", "comments"}
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS info (
+            video_id TEXT PRIMARY KEY,
+            info TEXT NOT NULL,
+            expires REAL NOT NULL
+        ) WITHOUT ROWID;
+        CREATE INDEX IF NOT EXISTS info_expires ON info (expires);
+    """
+
+    @staticmethod
+    def expiry(info: dict) -> float:
+        now = time.time()
+        stamps = []
+        for f in info.get("formats") or ():
+            match = re.search(r"[?&/]expire[=/](\d+)", f.get("url") or "")
+            if match:
+                stamps.append(int(match.group(1)))
+        if not stamps:
+            return now + InfoCache.DEFAULT_TTL
+        return min(min(stamps) - InfoCache.EXPIRY_MARGIN, now + InfoCache.MAX_TTL)
+
+    def get(self, video_id: str) -> Optional[dict]:
+        def lookup(db):
+            row = db.execute("SELECT info, expires FROM info WHERE video_id = ?", (video_id,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= time.time():
+                db.execute("DELETE FROM info WHERE video_id = ?", (video_id,))
+                return None
+            return json.loads(row[0])
+
+        return self._run(lookup)
+
+    def put(self, info: dict):
+        if info.get("_type", "video") != "video" or not info.get("id") or info.get("is_live"):
+            return
+        trimmed = {k: v for k, v in info.items() if k not in self.DROP_KEYS}
+        expires = self.expiry(trimmed)
+        if expires <= time.time():
+            return
+
+        def store(db):
+            db.execute(
+                "INSERT OR REPLACE INTO info (video_id, info, expires) VALUES (?, ?, ?)",
+                (info["id"], json.dumps(trimmed), expires),
+            )
+            db.execute("DELETE FROM info WHERE expires <= ?", (time.time(),))
+
+        self._run(store)
+
+
+# -----------------------------
+# Download Archive
+# -----------------------------
+class DownloadArchive(SQLiteStore):
+    # Keyed lookups on the primary key, so checking a video costs the same
+    # with a handful of entries or hundreds of thousands.
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS archive (
+            video_id TEXT NOT NULL,
+            fmt TEXT NOT NULL,
+            path TEXT NOT NULL,
+            size INTEGER NOT NULL,
+            downloaded REAL NOT NULL,
+            PRIMARY KEY (video_id, fmt)
+        ) WITHOUT ROWID;
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        super().__init__(path or os.path.join(data_dir(), "archive.sqlite3"))
+
+    def lookup(self, video_id: str, fmt: str) -> Optional[str]:
+        row = self._run(
+            lambda db: db.execute(
+                "SELECT path, size FROM archive WHERE video_id = ? AND fmt = ?", (video_id, fmt)
+            ).fetchone()
+        )
+        if row is None:
+            return None
+        path, size = row
+        try:
+            if os.path.getsize(path) == size:
+                return path
+        except OSError:
+            pass
+        # The file was moved, deleted or truncated since; forget about it
+        self._run(lambda db: db.execute("DELETE FROM archive WHERE video_id = ? AND fmt = ?", (video_id, fmt)))
+        return None
+
+    def record(self, video_id: str, fmt: str, path: str):
+        try:
+            size = os.path.getsize(path)
+        except OSError:
+            return
+        self._run(
+            lambda db: db.execute(
+                "INSERT OR REPLACE INTO archive (video_id, fmt, path, size, downloaded) VALUES (?, ?, ?, ?, ?)",
+                (video_id, fmt, os.path.abspath(path), size, time.time()),
+            )
+        )
+
+
+# -----------------------------
+# Usage Counters
+# -----------------------------
+class Stats(SQLiteStore):
+    SCHEMA = """
+        CREATE TABLE IF NOT EXISTS counters (
+            name TEXT PRIMARY KEY,
+            value INTEGER NOT NULL
+        ) WITHOUT ROWID;
+    """
+
+    def incr(self, name: str, amount: int = 1):
+        self._run(
+            lambda db: db.execute(
+                "INSERT INTO counters (name, value) VALUES (?, ?) "
+                "ON CONFLICT (name) DO UPDATE SET value = value + excluded.value",
+                (name, amount),
+            )
+        )
+
+    def all(self) -> Dict[str, int]:
+        return dict(self._run(lambda db: db.execute("SELECT name, value FROM counters ORDER BY name").fetchall()) or [])
+
+
+SEARCH_CACHE = SearchCache()
+INFO_CACHE = InfoCache()
+ARCHIVE = DownloadArchive()
+STATS = Stats()
+for _store in (SEARCH_CACHE, INFO_CACHE, ARCHIVE, STATS):
+    atexit.register(_store.close)
+
+
+# -----------------------------
+# Job Journal
+# -----------------------------
+try:
+    import fcntl
+except ImportError:  # not POSIX; journal writes are then only thread-safe
+    fcntl = None
+
+
+def _pid_alive(pid) -> bool:
+    if not pid or pid == os.getpid() or os.name != "posix":
+        return False
+    try:
+        os.kill(pid, 0)
+    except PermissionError:
+        return True  # alive, just someone else's
+    except OSError:
+        return False
+    return True
+
+
+class JobJournal:
+    # Append-only JSON lines, fsynced on every phase change, so a crash at
+    # any point leaves enough behind for --resume to pick up where it died.
+    # yt-dlp resumes the .part file itself as long as the job is re-run with
+    # the same URL, format and output. Several processes may share the
+    # journal: appends and compaction hold an exclusive flock on a sidecar
+    # lock file, and every record names the pid that owns the job.
+    PHASES = ("queued", "searched", "extracted", "downloading", "postprocessing", "done", "failed")
+    PROGRESS_INTERVAL: float = 5.0
+    COMPACT_SIZE: int = 4 * 2**20
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.path.join(state_dir(), "journal.jsonl")
+        self._lock = threading.Lock()
+        self._file = None
+        self._warned = False
+
+    @staticmethod
+    def job_id(query: str, fmt: str, output_path: str, audio: bool) -> str:
+        spec = json.dumps([query, fmt, output_path, audio])
+        return hashlib.sha1(spec.encode("utf-8")).hexdigest()[:16]
+
+    def start(self, query: str, fmt: str, output_path: str, audio: bool = False) -> str:
+        output_path = os.path.abspath(os.path.expanduser(output_path))
+        job = self.job_id(query, fmt, output_path, audio)
+        self.record(job, "queued", query=query, fmt=fmt, output=output_path, audio=audio)
+        return job
+
+    def record(self, job: Optional[str], phase: str, sync: bool = True, **fields):
+        if job is None:
+            return
+        line = json.dumps({"job": job, "phase": phase, "ts": time.time(), "pid": os.getpid(), **fields}) + "\n"
+        with self._lock:
+            try:
+                with self._flock():
+                    if self._file is not None and self._replaced():
+                        self._file.close()
+                        self._file = None
+                    if self._file is None:
+                        if os.path.exists(self.path) and os.path.getsize(self.path) > self.COMPACT_SIZE:
+                            self._compact()
+                        self._file = open(self.path, "a", encoding="utf-8")
+                    self._file.write(line)
+                    self._file.flush()
+                    if sync:
+                        os.fsync(self._file.fileno())
+            except OSError as e:
+                if not self._warned:
+                    self._warned = True
+                    print(f"⚠️  Job journal unavailable ({self.path}): {e}", file=sys.stderr)
+
+    @contextmanager
+    def _flock(self):
+        # Callers hold self._lock; this keeps other processes out
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        if fcntl is None:
+            yield
+            return
+        with open(f"{self.path}.lock", "a") as lock:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+    def _replaced(self) -> bool:
+        # Another process compacted the journal since it was opened here
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._file.fileno()).st_ino
+        except FileNotFoundError:
+            return True
+
+    def progress_hook(self, job: Optional[str]):
+        last = [0.0]
+
+        def hook(d: dict):
+            now = time.monotonic()
+            if d.get("status") == "downloading" and now - last[0] >= self.PROGRESS_INTERVAL:
+                last[0] = now
+                self.record(
+                    job,
+                    "downloading",
+                    sync=False,
+                    part=d.get("tmpfilename"),
+                    offset=d.get("downloaded_bytes"),
+                    total=d.get("total_bytes") or d.get("total_bytes_estimate"),
+                )
+            elif d.get("status") == "finished":
+                self.record(job, "postprocessing", file=d.get("filename"))
+
+        return hook
+
+    def _read(self) -> "OrderedDict[str, dict]":
+        jobs: "OrderedDict[str, dict]" = OrderedDict()
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue  # torn final line from a crash
+                    jobs.setdefault(entry["job"], {}).update(entry)
+        except FileNotFoundError:
+            pass
+        return jobs
+
+    def pending(self) -> List[dict]:
+        # Unfinished jobs, except those another live process is still running
+        with self._lock:
+            try:
+                with self._flock():
+                    jobs = self._read()
+            except OSError:
+                jobs = self._read()
+        return [job for job in jobs.values() if job["phase"] != "done" and not _pid_alive(job.get("pid"))]
+
+    def _compact(self):
+        # Keep only unfinished jobs, folded into one line each
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            for job in self._read().values():
+                if job["phase"] != "done":
+                    f.write(json.dumps(job) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    def compact(self):
+        with self._lock:
+            try:
+                with self._flock():
+                    self._compact()
+            except OSError:
+                pass
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+JOURNAL = JobJournal()
+atexit.register(JOURNAL.close)
+
+
+# -----------------------------
+# Free Filename Resolution
+# -----------------------------
+class FilenameResolver:
+    # Finds the next free "name (N).ext" from one directory scan instead of
+    # probing every candidate with a stat. Names handed out are remembered,
+    # so concurrent callers never receive the same one even before the files
+    # exist, and a changed directory mtime triggers a rescan for writers
+    # outside this process. With claim=True the name is also created
+    # (O_EXCL), so another process can't take it between the check and use.
+    _NUMBERED = re.compile(r"^(?P<base>.*) \((?P<n>\d+)\)$")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._dirs: Dict[str, tuple] = {}
+
+    def _scan(self, directory: str) -> Dict[tuple, list]:
+        index: Dict[tuple, list] = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                self._add(index, entry.name)
+        return index
+
+    def _add(self, index: Dict[tuple, list], name: str):
+        # Every name marks its own stem as taken, and a numbered one also
+        # raises its base's highest suffix: "Foo (1).mp4" blocks both a
+        # request for "Foo (1).mp4" and "Foo (1).mp4" as the next "Foo" copy
+        stem, ext = os.path.splitext(name)
+        index.setdefault((stem, ext), [False, 0])[0] = True
+        match = self._NUMBERED.match(stem)
+        if match:
+            slot = index.setdefault((match.group("base"), ext), [False, 0])
+            slot[1] = max(slot[1], int(match.group("n")))
+
+    def resolve(self, path: str, claim: bool = False) -> str:
+        directory, name = os.path.split(os.path.abspath(path))
+        base, ext = os.path.splitext(name)
+        with self._lock:
+            try:
+                mtime = os.stat(directory).st_mtime_ns
+            except FileNotFoundError:
+                return path
+            cached = self._dirs.get(directory)
+            if cached is None or cached[0] != mtime:
+                reserved = cached[2] if cached else set()
+                index = self._scan(directory)
+                for taken in reserved:
+                    self._add(index, taken)
+                cached = (mtime, index, reserved)
+                self._dirs[directory] = cached
+            _, index, reserved = cached
+
+            while True:
+                taken, highest = index.get((base, ext), (False, 0))
+                candidate = name if not taken else f"{base} ({highest + 1}){ext}"
+                self._add(index, candidate)
+                reserved.add(candidate)
+                target = os.path.join(directory, candidate)
+                if claim:
+                    try:
+                        os.close(os.open(target, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o644))
+                        break
+                    except FileExistsError:
+                        continue
+                # Last line of defence against a writer that raced the mtime check
+                if not os.path.exists(target):
+                    break
+        if candidate == name:
+            return path
+        return os.path.join(os.path.dirname(path), candidate)
+
+
+FILENAME_RESOLVER = FilenameResolver()
+
+
+# -----------------------------
+# Phase Timings
+# -----------------------------
+class Timings:
+    # Wall-clock seconds per phase, summed over every job that shares the
+    # instance (batch workers add to the same one), plus transfer volume.
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.phases: "OrderedDict[str, float]" = OrderedDict()
+        self.bytes = 0
+        self.jobs = 0
+        # Fragmented downloads per concurrent_fragment_downloads level
+        self.fragments: Dict[str, int] = {}
+        self.started = time.monotonic()
+
+    def add(self, phase: str, seconds: float):
+        with self._lock:
+            self.phases[phase] = self.phases.get(phase, 0.0) + max(seconds, 0.0)
+
+    @contextmanager
+    def span(self, phase: str):
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.add(phase, time.monotonic() - start)
+
+    def absorb(self, report: dict):
+        with self._lock:
+            for phase, seconds in report.get("phases", {}).items():
+                self.phases[phase] = self.phases.get(phase, 0.0) + seconds
+            self.bytes += report.get("bytes", 0)
+            self.jobs += report.get("jobs", 0)
+            for level, count in report.get("fragment_concurrency", {}).items():
+                self.fragments[level] = self.fragments.get(level, 0) + count
+
+    def note_fragments(self, level: int):
+        with self._lock:
+            self.fragments[str(level)] = self.fragments.get(str(level), 0) + 1
+
+    def write(self, target: str):
+        data = json.dumps(self.report(), indent=2)
+        if target == "-":
+            print(data)
+        else:
+            with open(os.path.expanduser(target), "w", encoding="utf-8") as f:
+                f.write(data + "\n")
+
+    def download_timer(self) -> "_DownloadTimer":
+        return _DownloadTimer(self)
+
+    def report(self) -> dict:
+        with self._lock:
+            transfer = self.phases.get("transfer", 0.0)
+            return {
+                "phases": {k: round(v, 3) for k, v in self.phases.items()},
+                "wall": round(time.monotonic() - self.started, 3),
+                "jobs": self.jobs,
+                "bytes": self.bytes,
+                "throughput_bps": round(self.bytes / transfer) if transfer else None,
+                "fragment_concurrency": dict(self.fragments),
+            }
+
+
+class _DownloadTimer:
+    # Splits one process_ie_result call into prepare (format selection,
+    # connection setup), transfer (first to last progress callback) and
+    # postprocess (merge/convert after the last file finished).
+    def __init__(self, timings: Timings):
+        self.timings = timings
+        self.started = time.monotonic()
+        self.first_byte: Optional[float] = None
+        self.last_finished: Optional[float] = None
+        self.fragmented = False
+        self._sizes: Dict[str, int] = {}
+
+    def hook(self, d: dict):
+        now = time.monotonic()
+        if d.get("fragment_count"):
+            self.fragmented = True
+        if self.first_byte is None and d.get("status") in ("downloading", "finished"):
+            self.first_byte = now
+        if d.get("status") == "finished":
+            self.last_finished = now
+            self._sizes[d.get("filename") or ""] = d.get("total_bytes") or d.get("downloaded_bytes") or 0
+
+    def finish(self):
+        end = time.monotonic()
+        first = self.first_byte or end
+        last = self.last_finished or end
+        self.timings.add("prepare", first - self.started)
+        self.timings.add("transfer", last - first)
+        self.timings.add("postprocess", end - last)
+        with self.timings._lock:
+            self.timings.bytes += sum(self._sizes.values())
+            self.timings.jobs += 1
+
+    def throughput(self) -> Optional[float]:
+        if self.first_byte is None or self.last_finished is None:
+            return None
+        seconds = self.last_finished - self.first_byte
+        size = sum(self._sizes.values())
+        return size / seconds if seconds > 0 and size else None
+
+
+# -----------------------------
+# Ranged Downloads
+# -----------------------------
+class RangedDownloadError(Exception):
+    pass
+
+
+class RangedDownloader:
+    # Fetches one known-size file as byte ranges over several connections,
+    # since YouTube throttles each connection rather than each client. The
+    # file is cut into CHUNK_SIZE slices shared by N workers, so a slow
+    # connection holds up one slice rather than a fixed Nth of the file, and
+    # a failed slice is retried on its own from where it stopped. Finished
+    # slices are listed in a state file next to the part file, so a run that
+    # was interrupted continues with the missing ones. Progress goes to
+    # yt-dlp style hooks; an exception from a hook aborts everything.
+    CHUNK_SIZE = 10 * 2**20
+    MAX_CONNECTIONS = 16
+    RETRIES = 3
+    READ_SIZE = 64 * 2**10
+    HOOK_INTERVAL = 0.5
+
+    def __init__(
+        self,
+        url: str,
+        size: int,
+        path: str,
+        connections: int = 4,
+        headers: Optional[Dict[str, str]] = None,
+        progress_hooks=(),
+    ):
+        self.url = url
+        self.size = size
+        self.path = path
+        # A private part file, so a fallback to yt-dlp never mistakes the
+        # preallocated holes for a resumable download
+        self.part = path + ".ranged.part"
+        self.state = path + ".ranged.state"
+        self.connections = max(1, min(connections, self.MAX_CONNECTIONS))
+        self.headers = dict(headers or {})
+        self.progress_hooks = list(progress_hooks)
+        self._lock = threading.Lock()
+        self._failed = threading.Event()
+        self._done = 0
+        self._state_file = None
+        self._started = 0.0
+        self._last_hook = 0.0
+
+    @staticmethod
+    def probe_size(url: str, headers: Optional[Dict[str, str]] = None) -> Optional[int]:
+        import requests
+
+        try:
+            response = _http_session().head(
+                url, headers=headers, allow_redirects=True, timeout=DEFAULT_BACKEND_TIMEOUT
+            )
+        except requests.RequestException as e:
+            raise RangedDownloadError(str(e)) from e
+        length = response.headers.get("Content-Length")
+        return int(length) if response.ok and length and length.isdigit() else None
+
+    def _report(self, status: str):
+        elapsed = time.monotonic() - self._started
+        d = {
+            "status": status,
+            "filename": self.path,
+            "tmpfilename": self.part,
+            "downloaded_bytes": self._done,
+            "total_bytes": self.size,
+            "elapsed": elapsed,
+            "speed": self._done / elapsed if elapsed > 0 else None,
+        }
+        for hook in self.progress_hooks:
+            hook(d)
+
+    def _advance(self, n: int):
+        with self._lock:
+            self._done += n
+            now = time.monotonic()
+            if now - self._last_hook >= self.HOOK_INTERVAL:
+                self._last_hook = now
+                self._report("downloading")
+
+    def _fetch(self, fd: int, start: int, end: int):
+        import requests
+
+        offset, error = start, None
+        for attempt in range(self.RETRIES + 1):
+            if attempt:
+                time.sleep(attempt)
+            try:
+                headers = dict(self.headers, Range=f"bytes={offset}-{end}")
+                with _http_session().get(
+                    self.url, headers=headers, stream=True, timeout=DEFAULT_BACKEND_TIMEOUT
+                ) as response:
+                    if response.status_code == 429 or response.status_code >= 500:
+                        error = f"HTTP {response.status_code}"
+                        continue
+                    if response.status_code != 206:
+                        raise RangedDownloadError(f"HTTP {response.status_code} for a range request")
+                    for data in response.iter_content(self.READ_SIZE):
+                        if self._failed.is_set():
+                            return
+                        data = data[: end + 1 - offset]
+                        os.pwrite(fd, data, offset)
+                        offset += len(data)
+                        self._advance(len(data))
+                        if offset > end:
+                            self._finish_chunk(fd, start)
+                            return
+                    error = "connection closed early"
+            except requests.RequestException as e:
+                error = str(e)
+        raise RangedDownloadError(f"bytes {start}-{end}: {error} after {self.RETRIES + 1} attempts")
+
+    def _header(self) -> str:
+        return json.dumps({"size": self.size, "chunk": self.CHUNK_SIZE}) + "\n"
+
+    def _finished_chunks(self) -> set:
+        # Chunk starts an interrupted earlier run completed, provided its
+        # part file is for a download of the same size and chunking
+        try:
+            with open(self.state, encoding="utf-8") as f:
+                if f.readline() != self._header() or os.path.getsize(self.part) != self.size:
+                    return set()
+                # A torn final line is simply not finished
+                return {int(line) for line in f if line.endswith("\n")}
+        except (OSError, ValueError):
+            return set()
+
+    def _finish_chunk(self, fd: int, start: int):
+        # Listed only once its data is on disk
+        os.fsync(fd)
+        with self._lock:
+            self._state_file.write(f"{start}\n")
+            self._state_file.flush()
+
+    def download(self) -> str:
+        part = self.part
+        resumed = self._finished_chunks()
+        fd = os.open(part, os.O_RDWR | os.O_CREAT | (0 if resumed else os.O_TRUNC), 0o644)
+        try:
+            if resumed:
+                self._state_file = open(self.state, "a", encoding="utf-8")
+            else:
+                self._state_file = open(self.state, "w", encoding="utf-8")
+                self._state_file.write(self._header())
+                self._state_file.flush()
+                os.ftruncate(fd, self.size)
+                if hasattr(os, "posix_fallocate"):
+                    try:
+                        os.posix_fallocate(fd, 0, self.size)
+                    except OSError:
+                        pass  # sparse is fine, e.g. on filesystems without fallocate
+            ranges = [
+                (start, min(start + self.CHUNK_SIZE, self.size) - 1)
+                for start in range(0, self.size, self.CHUNK_SIZE)
+                if start not in resumed
+            ]
+            self._done = self.size - sum(end + 1 - start for start, end in ranges)
+            self._started = time.monotonic()
+            with ThreadPoolExecutor(max_workers=max(1, min(self.connections, len(ranges)))) as pool:
+                futures = [pool.submit(self._fetch, fd, start, end) for start, end in ranges]
+                finished, _ = wait(futures, return_when=FIRST_EXCEPTION)
+                failure = next((f.exception() for f in finished if f.exception() is not None), None)
+                if failure is not None:
+                    self._failed.set()
+                    for future in futures:
+                        future.cancel()
+                    raise failure
+            os.fsync(fd)
+            with self._lock:
+                self._report("finished")
+            os.replace(part, self.path)
+        except RangedDownloadError:
+            # yt-dlp takes over with its own part file. Anything else (an
+            # interrupt, a hook aborting) leaves both for the next run.
+            self._discard(part)
+            raise
+        finally:
+            os.close(fd)
+            if self._state_file is not None:
+                self._state_file.close()
+        self._discard()
+        return self.path
+
+    def _discard(self, *paths: str):
+        for path in (*paths, self.state):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+
+# -----------------------------
+# Fragment Concurrency
+# -----------------------------
+class FragmentTuner:
+    # Chooses concurrent_fragment_downloads for --fragments auto, shared by
+    # every download in the process (batch workers, the daemon). The level
+    # doubles while fragmented downloads keep getting faster than at half
+    # the level, steps back and stays there once they don't, and is halved
+    # with a lower ceiling after a 429 or 5xx. yt-dlp retries and then skips
+    # failed fragments rather than raising, so those are counted from its
+    # retry messages as well as taken from errors.
+    START = 2
+    MAX = 16
+    GAIN = 1.1
+    THROTTLED = re.compile(r"HTTP Error (?:429|5\d\d)")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._level = self.START
+        self._ceiling = self.MAX
+        self._rates: Dict[int, float] = {}
+
+    def level(self) -> int:
+        with self._lock:
+            return self._level
+
+    def listener(self, throttled: list):
+        # For YoutubeDLPool.checkout: collects "Got error: HTTP Error 503..."
+        def listen(message: str):
+            if "Got error" in message and self.THROTTLED.search(message):
+                throttled.append(message)
+
+        return listen
+
+    def report(
+        self, level: int, timer: "_DownloadTimer", error: Optional[BaseException] = None, throttled: int = 0
+    ):
+        # throttled: fragment requests retried after a 429 or 5xx
+        with self._lock:
+            if throttled or (error is not None and self.THROTTLED.search(str(error))):
+                self._ceiling = max(1, level - 1)
+                self._level = max(1, min(level // 2, self._ceiling))
+                return
+            if error is not None:
+                return
+            rate = timer.throughput()
+            if not timer.fragmented or not rate:
+                return
+            # Smoothed per level, videos differ more than levels do
+            previous = self._rates.get(level)
+            self._rates[level] = rate if previous is None else (previous + rate) / 2
+            if level != self._level:
+                return  # started before the last change, says nothing new
+            lower = self._rates.get(level // 2)
+            if lower is not None and self._rates[level] < lower * self.GAIN:
+                self._level = self._ceiling = max(1, level // 2)
+            elif level * 2 <= self._ceiling:
+                self._level = level * 2
+
+
+FRAGMENT_TUNER = FragmentTuner()
+
+
+# -----------------------------
+# Bandwidth Limiting
+# -----------------------------
+_RATE = re.compile(r"^(\d+(?:\.\d+)?)\s*([kmg]?)(?:i?b)?(?:/s)?$", re.IGNORECASE)
+
+
+def parse_rate(text: str) -> Optional[float]:
+    # Bytes per second from "800K", "5M", "1.5MiB/s" or plain bytes
+    match = _RATE.match(text.strip())
+    if not match:
+        return None
+    return float(match.group(1)) * 1024 ** " kmg".index(match.group(2).lower() or " ")
+
+
+def format_rate(rate: float) -> str:
+    return f"{rate / 2**20:.2f}MiB/s" if rate else "unlimited"
+
+
+class BandwidthLimiter:
+    # Process-wide token bucket every download draws from through a progress
+    # hook: yt-dlp calls hooks from its read loop, so sleeping there slows the
+    # transfer itself. Each hook call reserves its bytes and waits its turn,
+    # which keeps concurrent jobs roughly fair. With a minimum share a job
+    # also passes whenever its own min_share bucket allows; those bytes become
+    # debt the bucket repays before any queued reservation, so the other jobs
+    # slow down instead. configure() takes effect on downloads already
+    # waiting, and in the daemon it covers every client.
+    # Seconds of traffic let through at once after idling, and of minimum
+    # share debt kept before the rest is forgiven so it can't stall later
+    # downloads. Queued reservations are never forgiven.
+    BURST = 1.0
+
+    def __init__(self, rate: float = 0, min_share: float = 0):
+        self._cond = threading.Condition()
+        self.rate = rate
+        self.min_share = min_share
+        self._allowed = 0.0
+        self._reserved = 0.0
+        self._debt = 0.0
+        self._refilled = time.monotonic()
+
+    def configure(self, rate: Optional[float] = None, min_share: Optional[float] = None):
+        with self._cond:
+            self._refill()
+            if rate is not None:
+                self.rate = rate
+            if min_share is not None:
+                self.min_share = min_share
+            self._cond.notify_all()
+
+    def settings(self) -> dict:
+        with self._cond:
+            return {"rate": self.rate, "min_share": self.min_share}
+
+    def _refill(self):
+        now = time.monotonic()
+        if self.rate > 0:
+            earned = self.rate * (now - self._refilled)
+            repaid = min(self._debt, earned)
+            self._debt -= repaid
+            self._allowed = min(self._allowed + earned - repaid, self._reserved + self.rate * self.BURST)
+        else:
+            self._allowed = self._reserved
+            self._debt = 0.0
+        self._refilled = now
+
+    def _charge(self, n: int):
+        # Bytes a minimum share let through; debt beyond BURST is forgiven
+        self._debt = min(self._debt + n, self.rate * self.BURST)
+
+    def _own_share(self, share: dict) -> Optional[float]:
+        # Seconds until the job's own bucket is out of debt (0 = now), or
+        # None without a minimum share
+        if self.min_share <= 0:
+            return None
+        now = time.monotonic()
+        share["tokens"] = min(share["tokens"] + self.min_share * (now - share["at"]), self.min_share * self.BURST)
+        share["at"] = now
+        return max(0.0, -share["tokens"] / self.min_share)
+
+    def consume(self, share: dict, n: int):
+        with self._cond:
+            if self.rate <= 0:
+                return
+            self._refill()
+            if self._own_share(share) == 0:
+                share["tokens"] -= n
+                self._charge(n)
+                return
+            self._reserved += n
+            ticket = self._reserved
+            while self.rate > 0 and self._allowed < ticket:
+                own = self._own_share(share)
+                if own == 0:
+                    # Leaves the queue: its reservation turns into debt
+                    share["tokens"] -= n
+                    self._allowed += n
+                    self._charge(n)
+                    self._cond.notify_all()
+                    return
+                wait = (ticket - self._allowed + self._debt) / self.rate
+                self._cond.wait(min(wait, own) if own is not None else wait)
+                self._refill()
+
+    def progress_hook(self) -> Callable[[dict], None]:
+        # One per download. Bytes are counted per file, since merged formats
+        # download one file after another and each restarts its count.
+        seen: Dict[str, int] = {}
+        share = {"tokens": self.min_share * self.BURST, "at": time.monotonic()}
+
+        def hook(d: dict):
+            if d.get("status") != "downloading":
+                return
+            name = d.get("tmpfilename") or d.get("filename") or ""
+            done = d.get("downloaded_bytes") or 0
+            n, seen[name] = done - seen.get(name, 0), done
+            if n > 0:
+                self.consume(share, n)
+
+        return hook
+
+
+BANDWIDTH = BandwidthLimiter()
+
+
+# -----------------------------
+# Adaptive Batch Concurrency
+# -----------------------------
+class ConcurrencyController:
+    # AIMD limit on how many batch jobs run at once (-j auto). Decisions are
+    # taken once per round, after as many downloads finished as the limit
+    # allowed, much like TCP per round trip. A round with throttling (HTTP
+    # 429/5xx) or too many failures halves the limit, one where aggregate
+    # throughput fell while per-job latency grew backs off by a quarter, and
+    # any other round adds one.
+    START = 2
+    DECREASE = 0.5
+    BACKOFF = 0.75
+    ERROR_RATE = 0.25
+    LATENCY_GROWTH = 1.2
+
+    def __init__(self, maximum: int, minimum: int = 1, log: Callable[[str], None] = print):
+        self.minimum = max(1, minimum)
+        self.maximum = max(self.minimum, maximum)
+        self.limit = max(self.minimum, min(self.START, self.maximum))
+        self.log = log
+        self.decisions: List[dict] = []
+        self._cond = threading.Condition()
+        self._active = 0
+        self._round: List[tuple] = []
+        self._round_started = time.monotonic()
+        self._throughput: Optional[float] = None
+        self._latency: Optional[float] = None
+
+    @contextmanager
+    def slot(self):
+        with self._cond:
+            while self._active >= self.limit:
+                self._cond.wait()
+            self._active += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._active -= 1
+                self._cond.notify()
+
+    def report(self, ok: bool, seconds: float, size: int, error: Optional[BaseException] = None):
+        with self._cond:
+            throttled = error is not None and bool(FragmentTuner.THROTTLED.search(str(error)))
+            self._round.append((ok, seconds, size, throttled))
+            if len(self._round) < self.limit:
+                return
+            now = time.monotonic()
+            finished, self._round = self._round, []
+            elapsed, self._round_started = now - self._round_started, now
+
+            throughput = sum(size for _, _, size, _ in finished) / elapsed if elapsed > 0 else 0.0
+            latency = sum(seconds for _, seconds, _, _ in finished) / len(finished)
+            failed = sum(1 for ok, _, _, _ in finished if not ok)
+            before = self.limit
+            if any(throttled for *_, throttled in finished) or failed / len(finished) > self.ERROR_RATE:
+                after, reason = int(before * self.DECREASE), "throttled or failing"
+            elif (
+                self._throughput is not None
+                and throughput < self._throughput
+                and latency > self._latency * self.LATENCY_GROWTH
+            ):
+                after, reason = int(before * self.BACKOFF), "slower"
+            else:
+                after, reason = before + 1, "steady"
+            self.limit = max(self.minimum, min(after, self.maximum))
+            self._throughput, self._latency = throughput, latency
+            decision = {
+                "from": before,
+                "to": self.limit,
+                "reason": reason,
+                "throughput_bps": round(throughput),
+                "latency": round(latency, 3),
+                "failed": failed,
+                "jobs": len(finished),
+            }
+            self.decisions.append(decision)
+            self._cond.notify_all()
+        self.log(
+            f"⚙️  jobs {before} → {self.limit} ({reason}): {throughput / 2**20:.2f}MiB/s, "
+            f"{latency:.1f}s per job, {failed}/{len(finished)} failed"
+        )
+
+
+# -----------------------------
+# Search Backends
+# -----------------------------
+# Each backend takes (query, max_results) and returns [{"title", "url"}, ...]
+# with YouTube watch URLs. Register extra ones (or local stubs) with
+# register_search_backend; the default timeout applies unless overridden.
+SearchBackend = Callable[[str, int], List[Dict[str, str]]]
+SEARCH_BACKENDS: Dict[str, tuple] = {}
+DEFAULT_BACKEND = "ytdlp"
+DEFAULT_BACKEND_TIMEOUT: float = 10.0
+
+
+def register_search_backend(name: str, timeout: float = DEFAULT_BACKEND_TIMEOUT):
+    def register(fn: SearchBackend) -> SearchBackend:
+        SEARCH_BACKENDS[name] = (fn, timeout)
+        return fn
+
+    return register
+
+
+def _watch_results(results, title_key: str, url_key: str, extra=None) -> List[Dict[str, str]]:
+    videos = []
+    for r in results:
+        video_id = YouTubeFetcher.video_id(r.get(url_key) or "")
+        if video_id:
+            video = {"title": r.get(title_key) or video_id, "url": f"https://www.youtube.com/watch?v={video_id}"}
+            if extra is not None:
+                video.update(extra(r))
+            videos.append(video)
+    return videos
+
+
+def _ddgs_fields(result) -> Dict:
+    return {
+        "duration": parse_duration(result.get("duration")),
+        "channel": result.get("uploader"),
+        "view_count": (result.get("statistics") or {}).get("viewCount"),
+    }
+
+
+@register_search_backend("ytdlp")
+def _ytdlp_backend(query: str, max_results: int) -> List[Dict[str, str]]:
+    return list(YouTubeFetcher.iter_search(query, max_results, use_cache=False))
+
+
+_HTTP_LOCK = threading.Lock()
+_HTTP_SESSION = None
+_INITIAL_DATA = re.compile(r"(?:var\s+|window\[['\"])ytInitialData(?:['\"]\])?\s*=\s*")
+
+
+def _http_session():
+    # One keep-alive session, so repeated requests skip the TLS handshake
+    global _HTTP_SESSION
+    with _HTTP_LOCK:
+        if _HTTP_SESSION is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+
+            _HTTP_SESSION = requests.Session()
+            # Room for every connection of a ranged download
+            adapter = HTTPAdapter(pool_maxsize=RangedDownloader.MAX_CONNECTIONS)
+            _HTTP_SESSION.mount("https://", adapter)
+            _HTTP_SESSION.mount("http://", adapter)
+            _HTTP_SESSION.headers.update(
+                {
+                    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0",
+                    "Accept-Language": "en-US,en;q=0.8",
+                }
+            )
+            # Skips the EU consent interstitial, which has no results in it
+            _HTTP_SESSION.cookies.set("CONSENT", "YES+", domain=".youtube.com")
+        return _HTTP_SESSION
+
+
+def _text(node) -> str:
+    if not isinstance(node, dict):
+        return ""
+    if "simpleText" in node:
+        return node["simpleText"]
+    return "".join(run.get("text", "") for run in node.get("runs", ()))
+
+
+def _video_renderers(node) -> Iterator[dict]:
+    # Walked rather than addressed by path: YouTube reshuffles the shelves
+    # around the results far more often than the renderers themselves
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            renderer = node.get("videoRenderer")
+            if isinstance(renderer, dict) and renderer.get("videoId"):
+                yield renderer
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def parse_search_page(html: str, max_results: int) -> List[Dict[str, str]]:
+    # Results embedded in a /results page as ytInitialData; raises ValueError
+    # when the page doesn't have them in the expected shape
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+    for script in soup.find_all("script"):
+        text = script.string or ""
+        match = _INITIAL_DATA.search(text)
+        if match:
+            data, _ = json.JSONDecoder().raw_decode(text, match.end())
+            break
+    else:
+        raise ValueError("no ytInitialData in the search page")
+    if not isinstance(data, dict) or "contents" not in data:
+        raise ValueError("unrecognised ytInitialData layout")
+
+    videos = []
+    for renderer in _video_renderers(data):
+        views = re.sub(r"\D", "", _text(renderer.get("viewCountText")))
+        videos.append(
+            {
+                "title": _text(renderer.get("title")) or renderer["videoId"],
+                "url": f"https://www.youtube.com/watch?v={renderer['videoId']}",
+                "duration": parse_duration(_text(renderer.get("lengthText"))),
+                "channel": _text(renderer.get("ownerText")) or None,
+                "view_count": int(views) if views else None,
+            }
+        )
+        if len(videos) >= max_results:
+            break
+    return videos
+
+
+@register_search_backend("html")
+def _html_backend(query: str, max_results: int) -> List[Dict[str, str]]:
+    # One plain GET of the results page instead of the ytsearch extractor.
+    # Only the first page (about 20 results) is parsed, and anything that
+    # doesn't parse falls back to yt-dlp. So does a page with no results:
+    # a layout change that hides every renderer looks exactly like one.
+    response = _http_session().get(
+        "https://www.youtube.com/results", params={"search_query": query, "hl": "en"}, timeout=DEFAULT_BACKEND_TIMEOUT
+    )
+    response.raise_for_status()
+    try:
+        videos = parse_search_page(response.text, max_results)
+    except (ValueError, KeyError, TypeError):
+        videos = []
+    if not videos:
+        STATS.incr("search.html_fallbacks")
+        return _ytdlp_backend(query, max_results)
+    return videos
+
+
+@register_search_backend("ddgs")
+def _ddgs_backend(query: str, max_results: int) -> List[Dict[str, str]]:
+    from ddgs import DDGS
+
+    # Other video hosts are filtered out, so ask for a little more than needed
+    results = DDGS().videos(f"{query} site:youtube.com", max_results=max_results * 2)
+    return _watch_results(results, "title", "content", _ddgs_fields)[:max_results]
+
+
+@register_search_backend("tavily")
+def _tavily_backend(query: str, max_results: int) -> List[Dict[str, str]]:
+    from tavily import TavilyClient
+
+    api_key = os.environ.get("TAVILY_API_KEY")
+    if not api_key:
+        raise RuntimeError("TAVILY_API_KEY is not set")
+    response = TavilyClient(api_key=api_key).search(
+        query, max_results=max_results, include_domains=["youtube.com", "youtu.be"]
+    )
+    return _watch_results(response.get("results", ()), "title", "url")[:max_results]
+
+
+def multi_search(
+    query: str,
+    max_results: int,
+    backends: List[str],
+    timeout: Optional[float] = None,
+    first_n: int = 0,
+) -> List[Dict[str, str]]:
+    # Runs every backend at once and merges by video ID. By default results
+    # are ordered by backend priority (the order given) once all backends
+    # answered or timed out; with first_n, whatever arrives first is returned
+    # as soon as that many unique videos are known.
+    unknown = [name for name in backends if name not in SEARCH_BACKENDS]
+    if unknown:
+        raise ValueError(f"unknown search backend(s): {', '.join(unknown)}")
+
+    executor = ThreadPoolExecutor(max_workers=len(backends))
+    started = time.monotonic()
+    futures = {executor.submit(SEARCH_BACKENDS[name][0], query, max_results): name for name in backends}
+    deadlines = {
+        future: started + (timeout if timeout is not None else SEARCH_BACKENDS[name][1])
+        for future, name in futures.items()
+    }
+    answers: Dict[str, List[Dict[str, str]]] = {}
+    arrived: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+    pending = set(futures)
+    try:
+        while pending:
+            remaining = max(0.0, min(deadlines[f] for f in pending) - time.monotonic())
+            done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = futures[future]
+                try:
+                    answers[name] = future.result()
+                except Exception as e:
+                    print(f"⚠️  Search backend {name} failed: {e}", file=sys.stderr)
+                    continue
+                for video in answers[name]:
+                    arrived.setdefault(YouTubeFetcher.video_id(video["url"]) or video["url"], video)
+            if first_n and len(arrived) >= first_n:
+                return list(arrived.values())[:max_results]
+            now = time.monotonic()
+            for future in [f for f in pending if deadlines[f] <= now]:
+                print(f"⚠️  Search backend {futures[future]} timed out", file=sys.stderr)
+                pending.discard(future)
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    merged: "OrderedDict[str, Dict[str, str]]" = OrderedDict()
+    for name in backends:
+        for video in answers.get(name, ()):
+            merged.setdefault(YouTubeFetcher.video_id(video["url"]) or video["url"], video)
+    return list(merged.values())[:max_results]
+
+
+_INFLIGHT_SEARCHES: Dict[str, Future] = {}
+_INFLIGHT_LOCK = threading.Lock()
+
+
+# -----------------------------
+# Result Ranking
+# -----------------------------
+_CLOCK = re.compile(r"^(?:(\d+):)?(\d+):(\d{1,2})$")
+
+
+def parse_duration(value) -> Optional[float]:
+    # Seconds from 245, "245", "4:05" or "1:04:05"; None when unknown
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    text = str(value).strip()
+    try:
+        return float(text)
+    except ValueError:
+        pass
+    match = _CLOCK.match(text)
+    if not match:
+        return None
+    hours, minutes, seconds = (int(group or 0) for group in match.groups())
+    return float(hours * 3600 + minutes * 60 + seconds)
+
+
+class ResultRanker:
+    # Scores flat search entries without extracting them, so batch runs can
+    # pick a result unattended instead of trusting YouTube's first hit. Query
+    # tokens and title markers are prepared once; each entry then costs a
+    # normalisation and a few set lookups, cheap enough for thousands.
+    # Entries missing duration, channel or views (cached by older versions,
+    # other backends) are simply scored on what they have.
+    AUDIO_MARKERS = {"official audio": 0.3, "lyrics": 0.15, "lyric video": 0.15, "official video": -0.1}
+    VIDEO_MARKERS = {"official video": 0.3, "official music video": 0.1, "lyrics": -0.15, "official audio": -0.1}
+    # Usually not what was asked for, unless the query says so
+    UNWANTED = ("cover", "karaoke", "remix", "live", "nightcore", "sped up", "slowed", "8d", "reaction", "instrumental")
+    UNWANTED_PENALTY = 0.4
+    LONG_AUDIO = 15 * 60
+
+    def __init__(
+        self,
+        query: str,
+        audio: bool = False,
+        target_duration: Optional[float] = None,
+        allow_channels=(),
+        deny_channels=(),
+    ):
+        text = word_text(query)
+        if _AUDIO_SUFFIX.search(text):
+            text, audio = _AUDIO_SUFFIX.sub("", text), True
+        self.tokens = set(text.split())
+        self.audio = audio
+        self.target_duration = target_duration
+        self.allow = {word_text(name) for name in allow_channels}
+        self.deny = {word_text(name) for name in deny_channels}
+        markers = self.AUDIO_MARKERS if audio else self.VIDEO_MARKERS
+        padded = f" {text} "
+        self.markers = [(f" {phrase} ", weight) for phrase, weight in markers.items() if f" {phrase} " not in padded]
+        self.unwanted = [f" {phrase} " for phrase in self.UNWANTED if f" {phrase} " not in padded]
+
+    def _channel(self, entry: Dict) -> str:
+        channel = word_text(entry.get("channel") or "")
+        # Auto-generated "Artist - Topic" channels match the artist's name
+        return channel[:-6] if channel.endswith(" topic") else channel
+
+    def score(self, entry: Dict) -> Optional[float]:
+        # None means the entry is excluded outright (denied channel)
+        channel = self._channel(entry)
+        if channel and channel in self.deny:
+            return None
+
+        title = word_text(entry.get("title") or "")
+        # Topic channels often title uploads with the song alone
+        words = set(title.split()) | set(channel.split())
+        score = 0.0
+        if self.tokens:
+            shared = len(self.tokens & words)
+            # Coverage of the query matters most, extra title words a little
+            score += shared / len(self.tokens) + 0.25 * shared / max(len(words), 1)
+
+        padded = f" {title} "
+        score += sum(weight for phrase, weight in self.markers if phrase in padded)
+        score -= sum(self.UNWANTED_PENALTY for phrase in self.unwanted if phrase in padded)
+
+        if channel and channel in self.allow:
+            score += 0.5
+        elif self.audio and (entry.get("channel") or "").endswith(" - Topic"):
+            score += 0.2
+
+        duration = parse_duration(entry.get("duration"))
+        if duration is not None:
+            if self.target_duration:
+                slack = max(self.target_duration * 0.25, 30.0)
+                score += 0.5 * max(0.0, 1 - abs(duration - self.target_duration) / slack)
+            elif self.audio and duration > self.LONG_AUDIO:
+                # Full albums, mixes and hour-long loops
+                score -= 0.3
+
+        views = entry.get("view_count")
+        if isinstance(views, (int, float)) and views > 0:
+            score += 0.02 * math.log10(views + 1)
+        return score
+
+    def rank(self, entries) -> List[Dict]:
+        # Best first; ties keep search order, denied channels are dropped
+        scored = [(score, entry) for entry in entries for score in (self.score(entry),) if score is not None]
+        scored.sort(key=lambda item: -item[0])
+        return [entry for _, entry in scored]
+
+    def best(self, entries) -> Optional[Dict]:
+        best, best_score = None, None
+        for entry in entries:
+            score = self.score(entry)
+            if score is not None and (best_score is None or score > best_score):
+                best, best_score = entry, score
+        return best
+
+
+# -----------------------------
+# Per-request Options
+# -----------------------------
+@dataclass
+class FetchOptions:
+    use_cache: bool = True
+    refresh: bool = False
+    dry_run: bool = False
+    force: bool = False
+    prefetch: bool = True
+    speculate: bool = False
+    backends: List[str] = field(default_factory=lambda: [DEFAULT_BACKEND])
+    backend_timeout: Optional[float] = None
+    first_n: int = 0
+    results: int = 5
+    # Upper bound for -j auto
+    max_jobs: int = 16
+    connections: int = 1
+    # concurrent_fragment_downloads for DASH/HLS; 0 lets FRAGMENT_TUNER pick
+    fragments: int = 1
+    # Non-interactive selection: a 1-based result number, or the best ranked
+    pick: int = 0
+    best: bool = False
+    target_duration: Optional[float] = None
+    allow_channels: List[str] = field(default_factory=list)
+    deny_channels: List[str] = field(default_factory=list)
+
+    def ranker(self, query: str, audio: bool = False) -> "ResultRanker":
+        return ResultRanker(query, audio, self.target_duration, self.allow_channels, self.deny_channels)
+
+
+# -----------------------------
+# Paged Search Results
+# -----------------------------
+class SearchPager:
+    # Serves a search page by page from one live, lazily consumed ytsearch,
+    # so asking for the next page continues where the previous one stopped
+    # instead of re-running the search with a bigger N. The first page is
+    # cached exactly like a plain youtube_search of the same size. Extra
+    # --backends can't be resumed, so they are asked one page at a time.
+    MAX_PAGES: int = 20
+
+    def __init__(self, query: str, options: FetchOptions):
+        self.query = query
+        self.options = options
+        self.page_size = options.results
+        self._gen = self._entries()
+
+    def _entries(self) -> Iterator[Dict[str, str]]:
+        opts = self.options
+        source = YouTubeFetcher.search_source(opts)
+        cached = None
+        if opts.use_cache and not opts.refresh:
+            cached = SEARCH_CACHE.get(self.query, self.page_size, source)
+        if cached is not None:
+            yield from cached
+            if len(cached) < self.page_size:
+                return  # the search had nothing more to give
+        if source:
+            yield from self._backend_pages(cached)
+            return
+
+        first_page: List[Dict[str, str]] = []
+        live = YouTubeFetcher.iter_search(self.query, self.page_size * self.MAX_PAGES, use_cache=False, options=opts)
+        try:
+            for i, video in enumerate(live):
+                if cached is not None:
+                    if i < len(cached):
+                        continue  # already served from the cache
+                elif len(first_page) < self.page_size:
+                    first_page.append(video)
+                    if len(first_page) == self.page_size and opts.use_cache:
+                        SEARCH_CACHE.put(self.query, self.page_size, first_page, source)
+                yield video
+        finally:
+            live.close()
+        if cached is None and 0 < len(first_page) < self.page_size and opts.use_cache:
+            SEARCH_CACHE.put(self.query, self.page_size, first_page, source)
+
+    def _backend_pages(self, cached) -> Iterator[Dict[str, str]]:
+        # Each page is its own multi_search for everything up to and including
+        # it, so page 1 costs what a plain search of page_size does; results
+        # already served are skipped by video ID
+        opts = self.options
+        seen = {YouTubeFetcher.video_id(v["url"]) or v["url"] for v in cached or ()}
+        for page in range(1 if cached is None else 2, self.MAX_PAGES + 1):
+            wanted = self.page_size * page
+            videos = multi_search(self.query, wanted, opts.backends, opts.backend_timeout, opts.first_n)
+            if page == 1 and opts.use_cache and videos and not opts.first_n:
+                SEARCH_CACHE.put(self.query, self.page_size, videos, YouTubeFetcher.search_source(opts))
+            fresh = 0
+            for video in videos:
+                key = YouTubeFetcher.video_id(video["url"]) or video["url"]
+                if key not in seen:
+                    seen.add(key)
+                    fresh += 1
+                    yield video
+            if not fresh or len(videos) < wanted:
+                return  # the backends had nothing more to give
+
+    def __iter__(self) -> Iterator[Dict[str, str]]:
+        return self._gen
+
+    def next_page(self) -> List[Dict[str, str]]:
+        return list(itertools.islice(self._gen, self.page_size))
+
+    def close(self):
+        self._gen.close()
+
+
+# -----------------------------
+# Metadata Prefetch
+# -----------------------------
+class InfoPrefetcher:
+    # Extracts search results in the background, as they arrive, while the
+    # user is still choosing, so the chosen one can go straight to
+    # process_ie_result.
+    MAX_WORKERS: int = 5
+    OPTS = {"quiet": True, "noprogress": True, "skip_download": True}
+
+    def __init__(self, options: FetchOptions, urls=()):
+        self.options = options
+        self._executor = ThreadPoolExecutor(max_workers=self.MAX_WORKERS)
+        self._futures: Dict[str, object] = {}
+        for url in urls:
+            self.add(url)
+
+    def add(self, url: str):
+        if url not in self._futures:
+            try:
+                self._futures[url] = self._executor.submit(self._extract, url)
+            except RuntimeError:
+                pass  # already closed, a choice has been made
+
+    def _extract(self, url: str) -> dict:
+        video_id = YouTubeFetcher.video_id(url)
+        if video_id and self.options.use_cache and not self.options.refresh:
+            cached = INFO_CACHE.get(video_id)
+            if cached is not None:
+                return cached
+        with YDL_POOL.checkout(self.OPTS) as ydl:
+            info = ydl.extract_info(url, download=False, process=False)
+            # Only the cached copy is sanitised: process_ie_result needs the
+            # private keys (__needs_testing, original_url) of the raw result
+            if self.options.use_cache:
+                INFO_CACHE.put(ydl.sanitize_info(info, remove_private_keys=True))
+        return info
+
+    def take(self, url: str) -> Optional[dict]:
+        future = self._futures.pop(url, None)
+        if future is None:
+            self.close()
+            return None
+        # Still queued behind other prefetches, where close() would cancel
+        # it: taken off the queue and run here instead
+        queued = future.cancel()
+        self.close()
+        try:
+            return self._extract(url) if queued else future.result()
+        except Exception:
+            return None  # download_video will extract (and report the error) itself
+
+    def close(self):
+        # Extractions already running finish in the background and still fill the cache
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+# -----------------------------
+# Speculative Download
+# -----------------------------
+class SpeculationCancelled(Exception):
+    pass
+
+
+class SpeculativeDownload:
+    # Starts fetching the top search result into a staging directory while
+    # the user is still choosing. If they pick it, the finished file is moved
+    # into place; otherwise the download is aborted and the staging area
+    # (including .part files) removed. Outcomes are counted in STATS.
+    STAGING_DIR = ".yt-dlx-staging"
+    STALE_AFTER: int = 24 * 3600
+    CANCEL_GRACE: float = 5.0
+
+    def __init__(self, url: str, fmt: str, output_path: str, options: FetchOptions):
+        self.url = url
+        self.fmt = fmt
+        self.output_path = os.path.expanduser(output_path)
+        self.options = replace(options, speculate=False)
+        self.is_dir = not os.path.splitext(self.output_path)[1]
+        parent = self.output_path if self.is_dir else os.path.dirname(self.output_path) or "."
+        self.root = os.path.join(parent, self.STAGING_DIR)
+        self._clean_stale(self.root)
+        self.staging = os.path.join(self.root, f"{os.getpid()}-{threading.get_ident()}-{time.monotonic_ns()}")
+        self.path: Optional[str] = None
+        self.error: Optional[BaseException] = None
+        self._cancelled = threading.Event()
+        self._bytes: Dict[str, int] = {}
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _clean_stale(self, root: str):
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    if entry.is_dir() and time.time() - entry.stat().st_mtime > self.STALE_AFTER:
+                        shutil.rmtree(entry.path, ignore_errors=True)
+        except OSError:
+            pass
+
+    def _discard(self):
+        shutil.rmtree(self.staging, ignore_errors=True)
+        try:
+            os.rmdir(self.root)
+        except OSError:
+            pass  # other speculative downloads are still using it
+
+    def start(self) -> "SpeculativeDownload":
+        self._thread.start()
+        return self
+
+    def _hook(self, d: dict):
+        if self._cancelled.is_set():
+            raise SpeculationCancelled()
+        self._bytes[d.get("filename") or ""] = d.get("downloaded_bytes") or 0
+
+    def _run(self):
+        target = self.staging if self.is_dir else os.path.join(self.staging, os.path.basename(self.output_path))
+        try:
+            self.path = YouTubeFetcher.download_video(
+                self.url, self.fmt, target, quiet=True, options=self.options, progress_hooks=[self._hook]
+            )
+        except BaseException as e:
+            self.error = e
+        finally:
+            if self._cancelled.is_set():
+                self._discard()
+
+    def _kill_children(self):
+        # ffmpeg postprocessors run as our child processes and never call a
+        # progress hook, so find the ones working inside the staging dir.
+        if not os.path.isdir("/proc"):
+            return
+        import signal
+
+        me = str(os.getpid())
+        for pid in filter(str.isdigit, os.listdir("/proc")):
+            try:
+                with open(f"/proc/{pid}/stat", "rb") as f:
+                    ppid = f.read().rsplit(b")", 1)[1].split()[1].decode()
+                if ppid != me:
+                    continue
+                with open(f"/proc/{pid}/cmdline", "rb") as f:
+                    if self.staging.encode() in f.read():
+                        os.kill(int(pid), signal.SIGTERM)
+            except (OSError, IndexError):
+                continue
+
+    def cancel(self):
+        self._cancelled.set()
+        self._kill_children()
+        self._thread.join(self.CANCEL_GRACE)
+        self._discard()
+        STATS.incr("speculate.misses")
+        STATS.incr("speculate.wasted_bytes", sum(self._bytes.values()))
+
+    def promote(self) -> Optional[str]:
+        self._thread.join()
+        if self.error is not None or not self.path:
+            self._discard()
+            return None
+        STATS.incr("speculate.hits")
+        STATS.incr("speculate.saved_bytes", sum(self._bytes.values()))
+        if not self.path.startswith(self.staging + os.sep):
+            return self.path  # already in the archive, nothing was staged
+
+        if self.is_dir:
+            final_path = os.path.join(self.output_path, os.path.basename(self.path))
+        else:
+            final_path = os.path.splitext(self.output_path)[0] + os.path.splitext(self.path)[1]
+        # Claimed as an empty file, which os.replace then overwrites, so a
+        # file another process created meanwhile is never clobbered
+        final_path = YouTubeFetcher.auto_number(final_path, claim=True)
+        try:
+            os.replace(self.path, final_path)
+        except OSError:
+            os.remove(final_path)
+            raise
+        self._discard()
+        video_id = YouTubeFetcher.video_id(self.url)
+        if video_id:
+            ARCHIVE.record(video_id, self.fmt, final_path)
+        return final_path
+
+
+# -----------------------------
+# Daemon Client Sessions
+# -----------------------------
+# Set on the handler thread while the daemon serves a client, so output,
+# prompts and progress are sent over the socket instead of the daemon's tty.
+_SESSION = threading.local()
+
+
+class _DaemonChannel:
+    def __init__(self, rfile, wfile):
+        self.rfile = rfile
+        self.wfile = wfile
+        self._lock = threading.Lock()
+        self._last_progress = 0.0
+
+    def send(self, message: dict):
+        data = (json.dumps(message) + "\n").encode("utf-8")
+        with self._lock:
+            self.wfile.write(data)
+            self.wfile.flush()
+
+    def receive(self) -> dict:
+        line = self.rfile.readline()
+        if not line:
+            raise ConnectionError("client disconnected")
+        return json.loads(line)
+
+    def choose(self, videos: List[Dict[str, str]], more=None) -> Dict[str, str]:
+        videos = list(videos)
+        self.send({"type": "choose", "videos": videos, "paged": more is not None})
+        while True:
+            reply = self.receive()
+            if not reply.get("more"):
+                break
+            videos.extend(more() if more is not None else [])
+            self.send({"type": "choose", "videos": videos, "paged": more is not None})
+        idx = int(reply["choice"])
+        if not 1 <= idx <= len(videos):
+            raise ValueError(f"invalid selection {idx}")
+        return videos[idx - 1]
+
+    def progress_hook(self, d: dict):
+        now = time.monotonic()
+        if d.get("status") == "downloading" and now - self._last_progress < 0.2:
+            return
+        self._last_progress = now
+        done = d.get("downloaded_bytes") or 0
+        total = d.get("total_bytes") or d.get("total_bytes_estimate")
+        percent = f"{100 * done / total:5.1f}%" if total else f"{done / 2**20:.1f}MiB"
+        speed = d.get("speed")
+        rate = f" at {speed / 2**20:.2f}MiB/s" if speed else ""
+        self.send({"type": "progress", "status": d.get("status"), "message": f"[download] {percent}{rate}"})
 
 
 @dataclass
@@ -12,6 +1956,9 @@ class YouTubeFetcher:
     DEFAULT_PATH: str = os.path.expanduser("~/Downloads")
     DEFAULT_CODEC: str = "mp4"
     VALID_CODECS = {"mp3", "mp4", "m4a", "opus", "webm"}
+    DEFAULT_JOBS: int = 4
+    TYPING_DEBOUNCE: float = 0.3
+    SEARCH_OPTS = {"quiet": True, "extract_flat": "in_playlist", "skip_download": True}
 
     # -----------------------------
     # Argument Parsing
@@ -20,50 +1967,409 @@ class YouTubeFetcher:
     def parse_arguments():
         parser = ArgumentParser(description="Search or download YouTube videos easily")
 
-        parser.add_argument("query", help="Search term or YouTube URL")
+        parser.add_argument("query", nargs="?", help="Search term or YouTube URL")
+        parser.add_argument(
+            "-f",
+            "--format",
+            choices=YouTubeFetcher.VALID_CODECS,
+            default=YouTubeFetcher.DEFAULT_CODEC,
+            help="Output format (mp3, mp4, m4a, opus, webm). Default: mp4",
+        )
+        parser.add_argument(
+            "-o",
+            "--output",
+            default=YouTubeFetcher.DEFAULT_PATH,
+            help="Output file or directory (can include extension, e.g. '~/Music/song.mp3')",
+        )
+        parser.add_argument(
+            "-a",
+            "--audio",
+            action="store_true",
+            help="Add 'audio' to the search query (useful when searching for songs)",
+        )
+        parser.add_argument(
+            "-n",
+            "--results",
+            type=int,
+            default=5,
+            metavar="N",
+            help="Number of search results per page. Default: 5",
+        )
+        parser.add_argument(
+            "-i",
+            "--interactive",
+            action="store_true",
+            help="Search as you type and queue downloads from a full-screen picker",
+        )
+        parser.add_argument(
+            "-b",
+            "--batch",
+            metavar="FILE",
+            help="Read URLs or search terms from FILE (one per line, '-' for stdin)",
+        )
+        parser.add_argument(
+            "-j",
+            "--jobs",
+            default=str(YouTubeFetcher.DEFAULT_JOBS),
+            metavar="N|auto",
+            help="Number of parallel downloads in batch mode, or 'auto' to adapt it to throughput "
+            f"and throttling. Default: {YouTubeFetcher.DEFAULT_JOBS}",
+        )
+        parser.add_argument(
+            "--max-jobs",
+            type=int,
+            default=FetchOptions.max_jobs,
+            metavar="N",
+            help=f"Upper bound for -j auto. Default: {FetchOptions.max_jobs}",
+        )
+
         parser.add_argument(
-            "-f",
-            "--format",
-            choices=YouTubeFetcher.VALID_CODECS,
-            default=YouTubeFetcher.DEFAULT_CODEC,
-            help="Output format (mp3, mp4, m4a, opus, webm). Default: mp4",
+            "--backends",
+            default=DEFAULT_BACKEND,
+            metavar="NAMES",
+            help=f"Comma-separated search backends to query in parallel ({', '.join(SEARCH_BACKENDS)}). "
+            f"Default: {DEFAULT_BACKEND}",
         )
         parser.add_argument(
-            "-o",
-            "--output",
-            default=YouTubeFetcher.DEFAULT_PATH,
-            help="Output file or directory (can include extension, e.g. '~/Music/song.mp3')",
+            "--backend-timeout",
+            type=float,
+            metavar="SECONDS",
+            help=f"Give up on a search backend after this long. Default: {DEFAULT_BACKEND_TIMEOUT:g}",
         )
         parser.add_argument(
-            "-a",
-            "--audio",
+            "--first-n",
+            type=int,
+            default=0,
+            metavar="N",
+            help="Return as soon as N unique results arrived from any backend",
+        )
+        picking = parser.add_mutually_exclusive_group()
+        picking.add_argument(
+            "--pick",
+            type=int,
+            default=0,
+            metavar="N",
+            help="Download search result N without asking",
+        )
+        picking.add_argument(
+            "--best",
             action="store_true",
-            help="Add 'audio' to the search query (useful when searching for songs)",
+            help="Download the best ranked search result without asking (default when stdin isn't a terminal)",
+        )
+        picking.add_argument(
+            "--all",
+            action="store_true",
+            help="Download every search result, --jobs at a time",
+        )
+        parser.add_argument(
+            "--duration",
+            metavar="LENGTH",
+            help="Expected length (seconds or M:SS); batch picks prefer results close to it",
+        )
+        parser.add_argument(
+            "--allow-channel",
+            action="append",
+            default=[],
+            metavar="NAME",
+            help="Prefer results from this channel when picking automatically (repeatable)",
+        )
+        parser.add_argument(
+            "--deny-channel",
+            action="append",
+            default=[],
+            metavar="NAME",
+            help="Never pick results from this channel automatically (repeatable)",
+        )
+        parser.add_argument(
+            "--connections",
+            type=int,
+            default=1,
+            metavar="N",
+            help="Download single-file formats over N parallel connections "
+            f"(1-{RangedDownloader.MAX_CONNECTIONS}). Default: 1",
+        )
+        parser.add_argument(
+            "--fragments",
+            default="1",
+            metavar="N|auto",
+            help="Fragments of DASH/HLS formats to download at once, or 'auto' to adapt to "
+            f"throughput and throttling (up to {FragmentTuner.MAX}). Default: 1",
+        )
+        parser.add_argument(
+            "--limit-rate",
+            metavar="RATE",
+            help="Cap the combined speed of all downloads, e.g. 5M or 800K (0 = unlimited). "
+            "Applies daemon-wide when a daemon runs the download; without a query it "
+            "just reconfigures the running daemon",
+        )
+        parser.add_argument(
+            "--min-share",
+            metavar="RATE",
+            help="Speed every download may keep however many share --limit-rate",
+        )
+        parser.add_argument(
+            "--no-cache",
+            action="store_true",
+            help="Don't read or write the search and video metadata caches",
+        )
+        parser.add_argument(
+            "--refresh",
+            action="store_true",
+            help="Ignore cached search results and metadata and store fresh ones",
+        )
+        parser.add_argument(
+            "--cache-ttl",
+            type=int,
+            default=SearchCache.DEFAULT_TTL,
+            metavar="SECONDS",
+            help=f"How long cached search results stay valid. Default: {SearchCache.DEFAULT_TTL}",
+        )
+        parser.add_argument(
+            "--cache-size",
+            type=int,
+            default=SearchCache.DEFAULT_MAX_ENTRIES,
+            metavar="N",
+            help=f"Maximum number of cached searches. Default: {SearchCache.DEFAULT_MAX_ENTRIES}",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Resolve the video and format without downloading anything",
+        )
+        parser.add_argument(
+            "--no-prefetch",
+            action="store_true",
+            help="Don't extract search results in the background while choosing",
+        )
+        parser.add_argument(
+            "--speculate",
+            action="store_true",
+            help="Start downloading the top search result while you choose",
+        )
+        parser.add_argument(
+            "--stats",
+            action="store_true",
+            help="Print search, cache and speculation counters and exit",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Download again even if the download archive already has this video",
+        )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Finish jobs left incomplete by an earlier run that crashed or was interrupted",
+        )
+        parser.add_argument(
+            "--timings",
+            nargs="?",
+            const="-",
+            metavar="FILE",
+            help="Write a JSON report of time spent per phase to FILE (stdout if omitted)",
+        )
+        parser.add_argument(
+            "--serve",
+            action="store_true",
+            help="Run a background daemon that keeps yt-dlp warm for later invocations",
+        )
+        parser.add_argument(
+            "--socket",
+            default=YouTubeFetcher.socket_path(),
+            help="Unix socket used to talk to the daemon",
+        )
+        parser.add_argument(
+            "--no-daemon",
+            action="store_true",
+            help="Always run in this process, even if a daemon is listening",
         )
 
-        return parser.parse_args()
+        args = parser.parse_args()
+        args.backends = [name.strip() for name in args.backends.split(",") if name.strip()]
+        unknown = [name for name in args.backends if name not in SEARCH_BACKENDS]
+        if unknown or not args.backends:
+            parser.error(f"unknown search backend(s): {', '.join(unknown)}")
+        if args.results < 1:
+            parser.error("--results must be at least 1")
+        # 0 stands for adaptive concurrency from here on
+        if args.jobs == "auto":
+            args.jobs = 0
+        elif args.jobs.isdigit() and int(args.jobs) >= 1:
+            args.jobs = int(args.jobs)
+        else:
+            parser.error("--jobs must be 'auto' or at least 1")
+        if args.max_jobs < 1:
+            parser.error("--max-jobs must be at least 1")
+        for name in ("limit_rate", "min_share"):
+            value = getattr(args, name)
+            if value is not None:
+                rate = parse_rate(value)
+                if rate is None:
+                    parser.error(f"--{name.replace('_', '-')} must be a rate like 5M or 800K")
+                setattr(args, name, rate)
+        args.bandwidth = args.limit_rate is not None or args.min_share is not None
+        if args.fragments == "auto":
+            args.fragments = 0
+        elif args.fragments.isdigit() and 1 <= int(args.fragments) <= FragmentTuner.MAX:
+            args.fragments = int(args.fragments)
+        else:
+            parser.error(f"--fragments must be 'auto' or between 1 and {FragmentTuner.MAX}")
+        if not 1 <= args.connections <= RangedDownloader.MAX_CONNECTIONS:
+            parser.error(f"--connections must be between 1 and {RangedDownloader.MAX_CONNECTIONS}")
+        if args.duration is not None:
+            args.duration = parse_duration(args.duration)
+            if not args.duration:
+                parser.error("--duration must be a length like 245 or 4:05")
+        if args.output.strip() == "-" and (args.serve or args.interactive or args.batch or args.all):
+            parser.error("-o - streams a single video and can't be combined with --serve, -i, --batch or --all")
+        bare = not args.query and not args.batch
+        if args.serve or args.stats or args.interactive or ((args.resume or args.bandwidth) and bare):
+            return args
+        if not args.query and not args.batch:
+            parser.error("a query, URL or --batch FILE is required")
+        if args.query and args.batch:
+            parser.error("--batch cannot be combined with a query")
+        if args.pick < 0:
+            parser.error("--pick must be at least 1")
+        if args.batch and args.all:
+            parser.error("--all cannot be combined with --batch")
+        return args
+
+    # -----------------------------
+    # Output
+    # -----------------------------
+    @staticmethod
+    def log(msg: str):
+        channel = getattr(_SESSION, "channel", None)
+        if channel is not None:
+            channel.send({"type": "log", "message": msg})
+        else:
+            print(msg, flush=True)
+
+    # -----------------------------
+    # URL Detection
+    # -----------------------------
+    @staticmethod
+    def is_youtube_url(query: str) -> bool:
+        return "youtube.com/watch" in query or "youtu.be/" in query
+
+    @staticmethod
+    def video_id(url: str) -> Optional[str]:
+        match = re.search(r"(?:[?&]v=|youtu\.be/|/shorts/|/embed/|/live/)([0-9A-Za-z_-]{11})", url)
+        return match.group(1) if match else None
 
     # -----------------------------
     # YouTube Search
     # -----------------------------
     @staticmethod
-    def youtube_search(query: str, max_results: int = 5) -> List[Dict[str, str]]:
-        ydl_opts = {"quiet": True, "extract_flat": "in_playlist", "skip_download": True}
-        with YoutubeDL(ydl_opts) as ydl:
+    def youtube_search(
+        query: str,
+        max_results: int = 5,
+        use_cache: bool = True,
+        refresh: bool = False,
+        options: Optional[FetchOptions] = None,
+    ) -> List[Dict[str, str]]:
+        # Identical searches already in flight (other batch workers, other
+        # daemon clients) share one request instead of each hitting YouTube
+        key = SEARCH_CACHE.key(query, max_results, YouTubeFetcher.search_source(options))
+        with _INFLIGHT_LOCK:
+            future = _INFLIGHT_SEARCHES.get(key)
+            owner = future is None
+            if owner:
+                future = _INFLIGHT_SEARCHES[key] = Future()
+        if not owner:
+            STATS.incr("queries.coalesced")
+            return list(future.result())
+
+        try:
+            videos = list(YouTubeFetcher.iter_search(query, max_results, use_cache, refresh, options))
+            future.set_result(videos)
+            return videos
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with _INFLIGHT_LOCK:
+                del _INFLIGHT_SEARCHES[key]
+
+    @staticmethod
+    def search_source(options: Optional[FetchOptions]) -> str:
+        # Part of the cache key; empty for the default yt-dlp-only search
+        if options is None or options.backends == [DEFAULT_BACKEND]:
+            return ""
+        return ",".join(options.backends)
+
+    @staticmethod
+    def iter_search(
+        query: str,
+        max_results: int = 5,
+        use_cache: bool = True,
+        refresh: bool = False,
+        options: Optional[FetchOptions] = None,
+    ) -> Iterator[Dict[str, str]]:
+        source = YouTubeFetcher.search_source(options)
+        if use_cache and not refresh:
+            cached = SEARCH_CACHE.get(query, max_results, source)
+            if cached is not None:
+                yield from cached
+                return
+
+        if source:
+            videos = multi_search(query, max_results, options.backends, options.backend_timeout, options.first_n)
+            # A first_n answer is deliberately partial, so it isn't cached
+            if use_cache and videos and not options.first_n:
+                SEARCH_CACHE.put(query, max_results, videos, source)
+            yield from videos
+            return
+
+        videos = []
+        with YDL_POOL.checkout(YouTubeFetcher.SEARCH_OPTS) as ydl:
             search_query = f"ytsearch{max_results}:{query}"
-            info = ydl.extract_info(search_query, download=False)
-            return [{"title": e["title"], "url": e["url"]} for e in info["entries"]]
+            # Unprocessed, "entries" is the extractor's lazy generator, so each
+            # result can be handed out as soon as yt-dlp has parsed it
+            info = ydl.extract_info(search_query, download=False, process=False)
+            for e in info.get("entries") or ():
+                video = {
+                    "title": e["title"],
+                    "url": e["url"],
+                    # Kept for ranking, flat entries already carry them
+                    "duration": e.get("duration"),
+                    "channel": e.get("channel") or e.get("uploader"),
+                    "view_count": e.get("view_count"),
+                }
+                videos.append(video)
+                yield video
+
+        # Only complete result lists are cached
+        if use_cache and videos:
+            SEARCH_CACHE.put(query, max_results, videos)
 
     # -----------------------------
     # User Video Selection
     # -----------------------------
     @staticmethod
-    def select_video(videos: List[Dict[str, str]]) -> Dict[str, str]:
+    def select_video(videos: List[Dict[str, str]], more=None) -> Dict[str, str]:
+        channel = getattr(_SESSION, "channel", None)
+        if channel is not None:
+            return channel.choose(videos, more)
+
+        videos = list(videos)
         for i, result in enumerate(videos, start=1):
             print(f"[{i}] {result['title']}\n    {result['url']}\n")
+        if more is not None:
+            print("(n = next page)")
 
         while True:
             choice = input(": ")
+            if more is not None and choice.strip().lower() == "n":
+                page = more()
+                if not page:
+                    print("No more results.")
+                    continue
+                for i, result in enumerate(page, start=len(videos) + 1):
+                    print(f"[{i}] {result['title']}\n    {result['url']}\n")
+                videos.extend(page)
+                continue
             if not choice.isdigit():
                 print("Invalid selection. Try again.")
                 continue
@@ -72,6 +2378,92 @@ class YouTubeFetcher:
                 return videos[idx - 1]
             print("Invalid selection. Try again.")
 
+    @staticmethod
+    def select_video_streaming(
+        entries: Iterator[Dict[str, str]], on_result=None, page_size: int = 0
+    ) -> Optional[Dict[str, str]]:
+        # Results are printed by a background thread as the search yields
+        # them; the user can pick any entry already on screen, which abandons
+        # the rest of the search. With a page size the thread pauses after
+        # each page until "n" asks for the next one; "p" reprints pages that
+        # are already in memory. The thread owns entries and closes them once
+        # stopped, usually after the user picked while it was still inside
+        # next(); callers must not close them as well.
+        videos: List[Dict[str, str]] = []
+        state = {"done": False, "error": None, "limit": page_size or float("inf"), "page": 0}
+        cond = threading.Condition()
+        stop = threading.Event()
+
+        def show(idx: int, video: Dict[str, str]):
+            print(f"[{idx}] {video['title']}\n    {video['url']}\n", flush=True)
+
+        def produce():
+            it = iter(entries)
+            try:
+                while True:
+                    with cond:
+                        cond.wait_for(lambda: stop.is_set() or len(videos) < state["limit"])
+                    if stop.is_set():
+                        break
+                    video = next(it, None)
+                    if video is None:
+                        break
+                    with cond:
+                        # Before it is printed, so it can't be picked before on_result saw it
+                        if on_result is not None:
+                            on_result(video)
+                        videos.append(video)
+                        show(len(videos), video)
+                        cond.notify_all()
+            except Exception as e:
+                state["error"] = e
+            finally:
+                if hasattr(entries, "close"):
+                    entries.close()
+                with cond:
+                    state["done"] = True
+                    cond.notify_all()
+
+        threading.Thread(target=produce, daemon=True).start()
+        with cond:
+            cond.wait_for(lambda: videos or state["done"])
+            if not videos:
+                if state["error"] is not None:
+                    raise state["error"]
+                return None
+        if page_size:
+            print("(n = next page, p = previous page)")
+
+        try:
+            while True:
+                choice = input(": ").strip().lower()
+                with cond:
+                    loaded, done = len(videos), state["done"]
+                    loading = not done and loaded < state["limit"]
+                    if page_size and choice in ("n", "p"):
+                        page = state["page"] + (1 if choice == "n" else -1)
+                        start = page * page_size
+                        if page < 0 or (start >= loaded and done):
+                            print("No more results." if page > 0 else "Already on the first page.")
+                            continue
+                        state["page"] = page
+                        for i, video in enumerate(videos[start : start + page_size], start=start + 1):
+                            show(i, video)
+                        # Anything not fetched yet is printed by the producer as it arrives
+                        state["limit"] = max(state["limit"], start + page_size)
+                        cond.notify_all()
+                        continue
+                if choice.isdigit() and 1 <= int(choice) <= loaded:
+                    return videos[int(choice) - 1]
+                if choice.isdigit() and int(choice) > loaded and loading:
+                    print("Still loading results, try again in a moment.")
+                    continue
+                print("Invalid selection. Try again.")
+        finally:
+            stop.set()
+            with cond:
+                cond.notify_all()
+
     # -----------------------------
     # Filename Sanitization
     # -----------------------------
@@ -83,20 +2475,69 @@ class YouTubeFetcher:
     # Auto-numbering for existing files
     # -----------------------------
     @staticmethod
-    def auto_number(path: str) -> str:
-        base, ext = os.path.splitext(path)
-        counter = 1
-        new_path = path
-        while os.path.exists(new_path):
-            new_path = f"{base} ({counter}){ext}"
-            counter += 1
-        return new_path
+    def auto_number(path: str, claim: bool = False) -> str:
+        return FILENAME_RESOLVER.resolve(path, claim)
 
     # -----------------------------
     # Download Logic
     # -----------------------------
     @staticmethod
-    def download_video(url: str, fmt: str, output_path: str):
+    def download_ranged(ydl: "YoutubeDL", info: dict, connections: int, progress_hooks=(), quiet: bool = False) -> bool:
+        # Fetches the selected format ahead of yt-dlp when it is one plain
+        # HTTP file; yt-dlp then finds it on disk and only postprocesses.
+        # Merged video+audio, HLS/DASH manifests and unknown sizes are left
+        # to yt-dlp, as is anything the ranged downloader gives up on.
+        selected = ydl.process_ie_result(dict(info), download=False)
+        if selected.get("requested_formats") or selected.get("protocol") not in ("http", "https"):
+            return False
+        path = ydl.prepare_filename(selected)
+        if not selected.get("url") or os.path.exists(path):
+            return False
+        headers = selected.get("http_headers")
+        try:
+            size = selected.get("filesize") or RangedDownloader.probe_size(selected["url"], headers)
+            if not size:
+                return False
+            RangedDownloader(selected["url"], size, path, connections, headers, progress_hooks).download()
+        except RangedDownloadError as e:
+            if not quiet:
+                YouTubeFetcher.log(f"⚠️ Ranged download failed ({e}), falling back to yt-dlp")
+            return False
+        return True
+
+    @staticmethod
+    def place_archived(existing: str, target: str) -> Optional[str]:
+        # Puts an archived download where the request asked for it, as a
+        # hard link or else a copy; None when something is already there
+        # (the same file, or one yt-dlp wouldn't overwrite either)
+        if os.path.exists(target):
+            return None
+        os.makedirs(os.path.dirname(target) or ".", exist_ok=True)
+        try:
+            os.link(existing, target)
+            return "linked"
+        except OSError:
+            part = target + ".part"
+            shutil.copy2(existing, part)
+            os.replace(part, target)
+            return "copied"
+
+    @staticmethod
+    def download_video(
+        url: str,
+        fmt: str,
+        output_path: str,
+        quiet: bool = False,
+        options: Optional[FetchOptions] = None,
+        job: Optional[str] = None,
+        timings: Optional[Timings] = None,
+        info: Optional[dict] = None,
+        progress_hooks=(),
+    ):
+        options = options or FetchOptions()
+        timings = timings or Timings()
+        if output_path == "-":
+            return YouTubeFetcher.stream_video(url, fmt, options, timings, info, progress_hooks)
         output_path = os.path.expanduser(output_path)
         os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
         is_dir = not os.path.splitext(output_path)[1]
@@ -111,7 +2552,19 @@ class YouTubeFetcher:
 
         is_audio = fmt in {"mp3", "m4a", "opus"}
 
-        ydl_opts = {"outtmpl": outtmpl, "quiet": False, "restrictfilenames": True}
+        # Inside the daemon yt-dlp would write to its own stdout, so progress
+        # is forwarded to the client through a hook instead
+        channel = getattr(_SESSION, "channel", None)
+        progress_hooks = list(progress_hooks)
+        if channel is not None:
+            progress_hooks.append(channel.progress_hook)
+        if job is not None:
+            progress_hooks.append(JOURNAL.progress_hook(job))
+        silent = quiet or channel is not None
+
+        ydl_opts = {"outtmpl": outtmpl, "quiet": silent, "restrictfilenames": True}
+        if silent:
+            ydl_opts["noprogress"] = True
 
         if is_audio:
             ydl_opts.update(
@@ -136,9 +2589,63 @@ class YouTubeFetcher:
                 }
             )
 
-        print(f"\n📥 Downloading to: {output_path}")
-        with YoutubeDL(ydl_opts) as ydl:
-            info = ydl.extract_info(url, download=True)
+        level = options.fragments or FRAGMENT_TUNER.level()
+        if level > 1:
+            ydl_opts["concurrent_fragment_downloads"] = level
+
+        video_id = YouTubeFetcher.video_id(url)
+        if video_id and not options.force:
+            with timings.span("archive"):
+                existing = ARCHIVE.lookup(video_id, fmt)
+            if existing:
+                # Where this request would have put it
+                if is_dir:
+                    target = os.path.join(output_path, os.path.basename(existing))
+                else:
+                    target = os.path.splitext(output_path)[0] + os.path.splitext(existing)[1]
+                if options.dry_run:
+                    how = None if os.path.exists(target) else "would be copied"
+                else:
+                    how = YouTubeFetcher.place_archived(existing, target)
+                if not quiet:
+                    where = f"{existing} ({how} to {target})" if how else target
+                    YouTubeFetcher.log(f"⏭️  Already downloaded: {where}")
+                JOURNAL.record(job, "done", path=target)
+                return target
+
+        if info is None and video_id and options.use_cache and not options.refresh:
+            with timings.span("extract"):
+                info = INFO_CACHE.get(video_id)
+
+        if not quiet and not options.dry_run:
+            YouTubeFetcher.log(f"\n📥 Downloading to: {output_path}")
+        timer = timings.download_timer()
+        progress_hooks.append(timer.hook)
+        progress_hooks.append(BANDWIDTH.progress_hook())
+        throttled: List[str] = []
+        with YDL_POOL.checkout(ydl_opts, progress_hooks, [FRAGMENT_TUNER.listener(throttled)]) as ydl:
+            if info is None:
+                # Extract without processing so the raw result can be cached
+                # and replayed later through process_ie_result
+                with timings.span("extract"):
+                    info = ydl.extract_info(url, download=False, process=False)
+                    if options.use_cache:
+                        INFO_CACHE.put(ydl.sanitize_info(info, remove_private_keys=True))
+            JOURNAL.record(job, "extracted", video_id=info.get("id"))
+            timer.started = time.monotonic()
+            if options.connections > 1 and not options.dry_run:
+                YouTubeFetcher.download_ranged(ydl, info, options.connections, progress_hooks, silent)
+            try:
+                info = ydl.process_ie_result(info, download=not options.dry_run)
+            except Exception as e:
+                if not options.fragments:
+                    FRAGMENT_TUNER.report(level, timer, e, len(throttled))
+                raise
+            timer.finish()
+            if timer.fragmented:
+                timings.note_fragments(level)
+                if not options.fragments:
+                    FRAGMENT_TUNER.report(level, timer, throttled=len(throttled))
 
             # Determine final path
             filename = YouTubeFetcher.sanitize_filename(info.get("title", "video"))
@@ -147,9 +2654,835 @@ class YouTubeFetcher:
                 f"{filename}.{fmt}",
             )
 
-            # Auto-number if file exists
-            final_path = YouTubeFetcher.auto_number(final_path)
-            print(f"✅ Saved as: {final_path}")
+            if options.dry_run:
+                fmt_id = info.get("format_id") or "+".join(f["format_id"] for f in info.get("requested_formats", ()))
+                YouTubeFetcher.log(f"🧪 Dry run: {info.get('title')} [{fmt_id}] -> {final_path}")
+                return final_path
+
+            # Prefer the path yt-dlp actually wrote (after postprocessing)
+            downloads = info.get("requested_downloads") or [{}]
+            if downloads[0].get("filepath"):
+                final_path = downloads[0]["filepath"]
+            else:
+                # Auto-number if file exists
+                final_path = YouTubeFetcher.auto_number(final_path)
+            if info.get("id"):
+                ARCHIVE.record(info["id"], fmt, final_path)
+            JOURNAL.record(job, "done", path=final_path)
+            if not quiet:
+                YouTubeFetcher.log(f"✅ Saved as: {final_path}")
+            return final_path
+
+    # -----------------------------
+    # Streaming to stdout
+    # -----------------------------
+    STREAM_FORMATS = {
+        "mp3": "bestaudio/best",
+        "m4a": "bestaudio[ext=m4a]/bestaudio/best",
+        "opus": "bestaudio[acodec^=opus]/bestaudio/best",
+        "mp4": "bestvideo[ext=mp4]+bestaudio[ext=m4a]/best[ext=mp4]/best",
+        "webm": "bestvideo[ext=webm]+bestaudio[ext=webm]/best[ext=webm]/best",
+    }
+    # ffmpeg output options per codec; audio is re-encoded at the same 192k
+    # FFmpegExtractAudio uses, unless the source codec already matches
+    STREAM_MUXERS = {
+        "mp3": (None, ["-c:a", "libmp3lame", "-b:a", "192k", "-f", "mp3"]),
+        "m4a": ("mp4a", ["-c:a", "aac", "-b:a", "192k", "-f", "ipod", "-movflags", "frag_keyframe+empty_moov"]),
+        "opus": ("opus", ["-c:a", "libopus", "-b:a", "192k", "-f", "opus"]),
+        "mp4": (None, ["-c", "copy", "-f", "mp4", "-movflags", "frag_keyframe+empty_moov"]),
+        "webm": (None, ["-c", "copy", "-f", "webm"]),
+    }
+
+    @staticmethod
+    def stream_video(
+        url: str,
+        fmt: str,
+        options: Optional[FetchOptions] = None,
+        timings: Optional[Timings] = None,
+        info: Optional[dict] = None,
+        progress_hooks=(),
+        sink=None,
+    ) -> str:
+        # -o -: the selected format is written to stdout (or sink) as it
+        # arrives and nothing touches the disk. A single file that is already
+        # in the right container is copied through requests in ranged chunks;
+        # merges, conversions and HLS go through an ffmpeg pipe instead.
+        options = options or FetchOptions()
+        timings = timings or Timings()
+        sink = sink or sys.__stdout__.buffer
+        is_audio = fmt in {"mp3", "m4a", "opus"}
+        video_id = YouTubeFetcher.video_id(url)
+        if info is None and video_id and options.use_cache and not options.refresh:
+            with timings.span("extract"):
+                info = INFO_CACHE.get(video_id)
+
+        with YDL_POOL.checkout({"quiet": True, "format": YouTubeFetcher.STREAM_FORMATS[fmt]}) as ydl:
+            if info is None:
+                with timings.span("extract"):
+                    info = ydl.extract_info(url, download=False, process=False)
+                    if options.use_cache:
+                        INFO_CACHE.put(ydl.sanitize_info(info, remove_private_keys=True))
+            selected = ydl.process_ie_result(dict(info), download=False)
+
+        formats = selected.get("requested_formats") or [selected]
+        fmt_ids = "+".join(f.get("format_id") or "?" for f in formats)
+        if options.dry_run:
+            YouTubeFetcher.log(f"🧪 Dry run: {selected.get('title')} [{fmt_ids}] -> stdout")
+            return "-"
+
+        direct = len(formats) == 1 and formats[0].get("protocol") in ("http", "https") and formats[0].get("ext") == fmt
+        timer = timings.download_timer()
+        hooks = [*progress_hooks, timer.hook, BANDWIDTH.progress_hook()]
+        YouTubeFetcher.log(f"📤 Streaming {selected.get('title')} [{fmt_ids}] to stdout")
+        try:
+            if direct:
+                YouTubeFetcher._stream_http(formats[0], sink, hooks)
+            else:
+                codec, output_args = YouTubeFetcher.STREAM_MUXERS[fmt]
+                if codec is not None and (formats[-1].get("acodec") or "").startswith(codec):
+                    output_args = ["-c:a", "copy", *output_args[output_args.index("-f"):]]
+                YouTubeFetcher._stream_ffmpeg(formats, sink, (["-vn"] if is_audio else []) + output_args)
+        except BrokenPipeError:
+            # The consumer stopped reading; point stdout at devnull so the
+            # interpreter doesn't fail flushing it on exit
+            devnull = os.open(os.devnull, os.O_WRONLY)
+            os.dup2(devnull, sink.fileno())
+            YouTubeFetcher.log("⏹️  Output closed by the reader")
+        timer.finish()
+        return "-"
+
+    @staticmethod
+    def _stream_http(fmt_info: dict, sink, hooks):
+        import requests
+
+        session = _http_session()
+        headers = dict(fmt_info.get("http_headers") or {})
+        d = {"status": "downloading", "filename": "-", "downloaded_bytes": 0, "total_bytes": fmt_info.get("filesize")}
+        failures = 0
+        # Ranged chunks: googlevideo throttles long single requests, and each
+        # chunk is written out as it arrives so memory stays bounded. A failed
+        # request is retried from the last byte already written.
+        while d["total_bytes"] is None or d["downloaded_bytes"] < d["total_bytes"]:
+            start = d["downloaded_bytes"]
+            headers["Range"] = f"bytes={start}-{start + RangedDownloader.CHUNK_SIZE - 1}"
+            try:
+                with session.get(
+                    fmt_info["url"], headers=headers, stream=True, timeout=DEFAULT_BACKEND_TIMEOUT
+                ) as response:
+                    if response.status_code == 416:
+                        break
+                    response.raise_for_status()
+                    ranged = response.status_code == 206
+                    if not ranged and start:
+                        raise RuntimeError("the server stopped honouring ranges mid-stream")
+                    size = response.headers.get("Content-Range", "").rpartition("/")[2]
+                    if ranged and size.isdigit():
+                        d["total_bytes"] = int(size)
+                    for chunk in response.iter_content(RangedDownloader.READ_SIZE):
+                        sink.write(chunk)
+                        d["downloaded_bytes"] += len(chunk)
+                        for hook in hooks:
+                            hook(d)
+                    sink.flush()
+            except requests.RequestException:
+                failures += 1
+                if failures > RangedDownloader.RETRIES:
+                    raise
+                time.sleep(failures)
+                continue
+            failures = 0
+            if not ranged or d["downloaded_bytes"] == start:
+                break
+        d["status"] = "finished"
+        d["total_bytes"] = d["downloaded_bytes"]
+        for hook in hooks:
+            hook(d)
+
+    @staticmethod
+    def _stream_ffmpeg(formats: List[dict], sink, output_args: List[str]):
+        import signal
+        import subprocess
+
+        ffmpeg = shutil.which("ffmpeg")
+        if ffmpeg is None:
+            raise RuntimeError("ffmpeg is needed to stream this format")
+        cmd = [ffmpeg, "-hide_banner", "-loglevel", "error", "-nostdin"]
+        for f in formats:
+            if f.get("protocol") not in ("http", "https", "m3u8", "m3u8_native"):
+                raise RuntimeError(f"can't stream {f.get('protocol')} formats")
+            headers = f.get("http_headers") or {}
+            if headers:
+                cmd += ["-headers", "".join(f"{k}: {v}\r\n" for k, v in headers.items())]
+            cmd += ["-i", f["url"]]
+        if len(formats) == 2:
+            cmd += ["-map", "0:v:0", "-map", "1:a:0"]
+        cmd += [*output_args, "pipe:1"]
+        sink.flush()
+        # ffmpeg writes straight into our stdout, no copy through Python
+        status = subprocess.run(cmd, stdout=sink.fileno()).returncode
+        if status != 0:
+            # Killed by SIGPIPE, or failing on EPIPE, when the reader went away
+            if status == -signal.SIGPIPE or YouTubeFetcher._reader_gone(sink.fileno()):
+                raise BrokenPipeError(f"ffmpeg's output was closed (status {status})")
+            raise RuntimeError(f"ffmpeg exited with status {status}")
+
+    @staticmethod
+    def _reader_gone(fd: int) -> bool:
+        # The write end of a pipe whose read end is closed polls as an error
+        import select
+
+        if not hasattr(select, "poll"):
+            return False
+        poller = select.poll()
+        poller.register(fd, select.POLLOUT)
+        try:
+            return any(event & (select.POLLERR | select.POLLHUP) for _, event in poller.poll(0))
+        except OSError:
+            return False
+
+    # -----------------------------
+    # Batch Mode
+    # -----------------------------
+    @staticmethod
+    def read_batch(source: str) -> Iterator[str]:
+        stream = sys.stdin if source == "-" else open(os.path.expanduser(source), encoding="utf-8")
+        try:
+            for line in stream:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    yield line
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+    @staticmethod
+    def resolve_url(query: str, audio: bool = False, options: Optional[FetchOptions] = None) -> Optional[str]:
+        options = options or FetchOptions()
+        if YouTubeFetcher.is_youtube_url(query):
+            return query
+        selection = YouTubeFetcher.pick_result(query, audio, options)
+        return selection["url"] if selection else None
+
+    @staticmethod
+    def pick_result(query: str, audio: bool = False, options: Optional[FetchOptions] = None) -> Optional[Dict[str, str]]:
+        # Selection without a human: --pick N takes that result as listed,
+        # otherwise a page of results is ranked locally rather than trusting
+        # the first hit
+        options = options or FetchOptions()
+        videos = YouTubeFetcher.youtube_search(
+            audio_query(query, audio),
+            max_results=max(options.results, options.pick),
+            use_cache=options.use_cache,
+            refresh=options.refresh,
+            options=options,
+        )
+        if options.pick:
+            return videos[options.pick - 1] if len(videos) >= options.pick else None
+        return options.ranker(query, audio).best(videos)
+
+    @staticmethod
+    def run_batch(
+        lines: Iterator[str],
+        fmt: str,
+        output_path: str,
+        audio: bool = False,
+        jobs: int = DEFAULT_JOBS,
+        options: Optional[FetchOptions] = None,
+        timings: Optional[Timings] = None,
+    ) -> int:
+        options = options or FetchOptions()
+        seen = set()
+        duplicates = []
+
+        def specs():
+            for query in lines:
+                if YouTubeFetcher.is_youtube_url(query):
+                    key = YouTubeFetcher.video_id(query) or query
+                else:
+                    key = normalize_query(query, audio)
+                if key in seen:
+                    duplicates.append(query)
+                    continue
+                seen.add(key)
+                job = None if options.dry_run else JOURNAL.start(query, fmt, output_path, audio)
+                yield {"job": job, "query": query, "fmt": fmt, "output": output_path, "audio": audio}
+
+        failed = YouTubeFetcher.run_jobs(specs(), jobs, options, timings)
+        if duplicates:
+            STATS.incr("queries.batch_duplicates", len(duplicates))
+            print(f"↺ Skipped {len(duplicates)} duplicate line(s)")
+        return failed
+
+    @staticmethod
+    def fetch_all(
+        query: str,
+        fmt: str,
+        output_path: str,
+        audio: bool = False,
+        jobs: int = DEFAULT_JOBS,
+        options: Optional[FetchOptions] = None,
+        timings: Optional[Timings] = None,
+    ) -> int:
+        # --all: every result of one search goes through the batch workers
+        options = options or FetchOptions()
+        timings = timings or Timings()
+        search = audio_query(query.strip(), audio)
+        print(f"🔍 Searching for: {search}")
+        with timings.span("search"):
+            videos = YouTubeFetcher.youtube_search(
+                search, max_results=options.results, use_cache=options.use_cache, refresh=options.refresh, options=options
+            )
+        if not videos:
+            print("No results found.")
+            return 1
+
+        def specs():
+            for video in videos:
+                # Journaled by URL, so --resume fetches exactly this result
+                job = None if options.dry_run else JOURNAL.start(video["url"], fmt, output_path, False)
+                yield {
+                    "job": job,
+                    "query": video["title"],
+                    "url": video["url"],
+                    "fmt": fmt,
+                    "output": output_path,
+                    "audio": False,
+                }
+
+        return YouTubeFetcher.run_jobs(specs(), jobs, options, timings)
+
+    @staticmethod
+    def run_jobs(
+        specs: Iterator[dict],
+        jobs: int = DEFAULT_JOBS,
+        options: Optional[FetchOptions] = None,
+        timings: Optional[Timings] = None,
+    ) -> int:
+        options = options or FetchOptions()
+        timings = timings or Timings()
+        print_lock = threading.Lock()
+        results = {"ok": 0, "failed": []}
+        started = time.monotonic()
+
+        def report(msg: str):
+            with print_lock:
+                print(msg, flush=True)
+
+        # jobs=0: enough workers for the upper bound, gated by the controller
+        controller = ConcurrencyController(options.max_jobs, log=report) if not jobs else None
+        workers_count = jobs or options.max_jobs
+        # Bounded so a huge input file is streamed rather than loaded up front
+        jobs_queue: queue.Queue = queue.Queue(maxsize=workers_count * 2)
+
+        def worker():
+            while True:
+                item = jobs_queue.get()
+                if item is None:
+                    return
+                with controller.slot() if controller is not None else nullcontext():
+                    run(*item)
+
+        def run(n: int, spec: dict):
+            query, job = spec["query"], spec["job"]
+            # Per job, so the controller sees this job's bytes alone
+            job_timings = Timings()
+            error = None
+            try:
+                url = spec.get("url")
+                if not url:
+                    with job_timings.span("search"):
+                        url = YouTubeFetcher.resolve_url(query, spec["audio"], options)
+                if not url:
+                    raise RuntimeError("no results found")
+                JOURNAL.record(job, "searched", url=url)
+                report(f"[{n}] 📥 {query}")
+                path = YouTubeFetcher.download_video(
+                    url, spec["fmt"], spec["output"], quiet=True, options=options, job=job, timings=job_timings
+                )
+                with print_lock:
+                    results["ok"] += 1
+                    print(f"[{n}] ✅ {path}", flush=True)
+            except Exception as e:
+                error = e
+                JOURNAL.record(job, "failed", error=str(e))
+                with print_lock:
+                    results["failed"].append((n, query, str(e)))
+                    print(f"[{n}] ❌ {query}: {e}", flush=True)
+            finally:
+                timings.absorb(job_timings.report())
+            # Archive hits and dry runs transfer nothing and say nothing about capacity
+            if controller is not None and (error is not None or job_timings.bytes):
+                controller.report(error is None, time.monotonic() - job_timings.started, job_timings.bytes, error)
+
+        workers = [threading.Thread(target=worker, daemon=True) for _ in range(workers_count)]
+        for t in workers:
+            t.start()
+        for n, spec in enumerate(specs, start=1):
+            jobs_queue.put((n, spec))
+        for _ in workers:
+            jobs_queue.put(None)
+        for t in workers:
+            t.join()
+
+        failed = results["failed"]
+        elapsed = time.monotonic() - started
+        print(f"\n📊 Finished in {elapsed:.1f}s: {results['ok']} succeeded, {len(failed)} failed")
+        if controller is not None and controller.decisions:
+            print(f"   Concurrency ended at {controller.limit} after {len(controller.decisions)} adjustment(s)")
+        for n, query, err in failed:
+            print(f"   [{n}] {query}: {err}")
+        return len(failed)
+
+    # -----------------------------
+    # Resuming Interrupted Jobs
+    # -----------------------------
+    @staticmethod
+    def resume(
+        jobs: int = DEFAULT_JOBS, options: Optional[FetchOptions] = None, timings: Optional[Timings] = None
+    ) -> int:
+        JOURNAL.compact()
+        pending = JOURNAL.pending()
+        if not pending:
+            print("Nothing to resume.")
+            return 0
+
+        print(f"↻ Resuming {len(pending)} unfinished job(s)")
+        for spec in pending:
+            if spec.get("offset") and spec.get("part") and os.path.exists(spec["part"]):
+                print(f"   {spec['query']}: {spec['offset'] / 2**20:.1f}MiB already on disk")
+        return YouTubeFetcher.run_jobs(iter(pending), jobs, options, timings)
+
+    # -----------------------------
+    # Single Query Flow
+    # -----------------------------
+    @staticmethod
+    def fetch(
+        query: str,
+        fmt: str,
+        output_path: str,
+        audio: bool = False,
+        options: Optional[FetchOptions] = None,
+        timings: Optional[Timings] = None,
+    ) -> Optional[str]:
+        options = options or FetchOptions()
+        timings = timings or Timings()
+        query = query.strip()
+        info = None
+        if YouTubeFetcher.is_youtube_url(query):
+            YouTubeFetcher.log("Detected direct YouTube link.")
+            url = query
+        elif options.pick or options.best:
+            YouTubeFetcher.log(f"🔍 Searching for: {audio_query(query, audio)}")
+            with timings.span("search"):
+                selection = YouTubeFetcher.pick_result(query, audio, options)
+            if selection is None:
+                YouTubeFetcher.log("No results found.")
+                return None
+            YouTubeFetcher.log(f"👉 {selection['title']}")
+            url = selection["url"]
+        else:
+            search = audio_query(query, audio)
+            YouTubeFetcher.log(f"🔍 Searching for: {search}")
+            pager = SearchPager(search, options)
+            prefetcher = InfoPrefetcher(options) if options.prefetch else None
+            started = time.monotonic()
+            # Whoever iterates the pager closes it: this thread for daemon
+            # clients, the streaming picker's producer thread otherwise
+            state = {"first": None, "speculative": None, "owns_pager": True}
+
+            def on_result(video: Dict[str, str]):
+                if state["first"] is None:
+                    state["first"] = time.monotonic()
+                    timings.add("search", state["first"] - started)
+                    if options.speculate and not options.dry_run:
+                        state["speculative"] = SpeculativeDownload(video["url"], fmt, output_path, options).start()
+                        return  # the speculative download extracts it already
+                if prefetcher is not None:
+                    prefetcher.add(video["url"])
+
+            try:
+                if getattr(_SESSION, "channel", None) is not None:
+                    # Daemon clients receive a whole page per message
+
+                    def next_page() -> List[Dict[str, str]]:
+                        page = pager.next_page()
+                        for video in page:
+                            on_result(video)
+                        return page
+
+                    videos = next_page()
+                    selection = YouTubeFetcher.select_video(videos, next_page) if videos else None
+                else:
+                    state["owns_pager"] = False
+                    selection = YouTubeFetcher.select_video_streaming(pager, on_result, options.results)
+                if selection is None:
+                    timings.add("search", time.monotonic() - started)
+                    YouTubeFetcher.log("No results found.")
+                    return None
+                timings.add("select", time.monotonic() - state["first"])
+                url = selection["url"]
+
+                staged, state["speculative"] = state["speculative"], None
+                if staged is not None:
+                    if url != staged.url:
+                        staged.cancel()
+                    else:
+                        with timings.span("speculative"):
+                            path = staged.promote()
+                        if path:
+                            YouTubeFetcher.log(f"✅ Saved as: {path}")
+                            return path
+                if prefetcher is not None:
+                    with timings.span("extract"):
+                        info = prefetcher.take(url)
+            finally:
+                if state["owns_pager"]:
+                    pager.close()
+                if prefetcher is not None:
+                    prefetcher.close()
+                if state["speculative"] is not None:
+                    state["speculative"].cancel()
+
+        # Journaled only once the video is chosen, so --resume never has to guess
+        # a selection; streams can't be resumed, the reader is gone
+        job = None if options.dry_run or output_path == "-" else JOURNAL.start(query, fmt, output_path, audio)
+        JOURNAL.record(job, "searched", url=url)
+        try:
+            return YouTubeFetcher.download_video(
+                url, fmt, output_path, options=options, job=job, timings=timings, info=info
+            )
+        except Exception as e:
+            JOURNAL.record(job, "failed", error=str(e))
+            raise
+
+    @staticmethod
+    def fetch_timed(
+        query: str, fmt: str, output_path: str, audio: bool = False, options: Optional[FetchOptions] = None
+    ) -> dict:
+        timings = Timings()
+        path = YouTubeFetcher.fetch(query, fmt, output_path, audio, options, timings)
+        return {"path": path, "timings": timings.report()}
+
+    # -----------------------------
+    # Search-as-you-type Mode
+    # -----------------------------
+    @staticmethod
+    def interactive(
+        fmt: str,
+        output_path: str,
+        audio: bool = False,
+        options: Optional[FetchOptions] = None,
+        initial_query: str = "",
+    ):
+        import asyncio
+
+        from prompt_toolkit.application import Application
+        from prompt_toolkit.buffer import Buffer
+        from prompt_toolkit.key_binding import KeyBindings
+        from prompt_toolkit.layout import HSplit, Layout, Window
+        from prompt_toolkit.layout.controls import BufferControl, FormattedTextControl
+        from prompt_toolkit.layout.dimension import Dimension
+        from prompt_toolkit.patch_stdout import patch_stdout
+
+        options = options or FetchOptions()
+        debounce = YouTubeFetcher.TYPING_DEBOUNCE
+        # At most two searches run at once; superseded ones finish in the
+        # background and their results are simply dropped.
+        searches = ThreadPoolExecutor(max_workers=2)
+        downloads = ThreadPoolExecutor(max_workers=YouTubeFetcher.DEFAULT_JOBS)
+        state = {"results": [], "selected": 0, "status": "Type to search", "generation": 0, "task": None}
+        queued: List[dict] = []
+
+        def search_text(text: str) -> str:
+            text = text.strip()
+            return text if YouTubeFetcher.is_youtube_url(text) else audio_query(text, audio)
+
+        def show(results: List[Dict[str, str]], status: str):
+            state["results"], state["selected"], state["status"] = results, 0, status
+            app.invalidate()
+
+        async def debounced_search(generation: int, query: str):
+            await asyncio.sleep(debounce)
+            state["status"] = f"Searching for {query!r}..."
+            app.invalidate()
+            try:
+                results = await asyncio.get_running_loop().run_in_executor(
+                    searches,
+                    lambda: YouTubeFetcher.youtube_search(
+                        query, options.results, use_cache=options.use_cache, refresh=options.refresh, options=options
+                    ),
+                )
+            except Exception as e:
+                if generation == state["generation"]:
+                    show([], f"❌ {e}")
+                return
+            if generation == state["generation"]:
+                show(results, f"{len(results)} result(s) for {query!r}")
+
+        def on_text_changed(buf: Buffer):
+            state["generation"] += 1
+            if state["task"] is not None:
+                state["task"].cancel()
+                state["task"] = None
+            query = search_text(buf.text)
+            if len(query) < 2:
+                show([], "Type to search")
+                return
+            if options.use_cache and not options.refresh:
+                cached = SEARCH_CACHE.get(query, options.results, YouTubeFetcher.search_source(options))
+                if cached is not None:
+                    show(cached, f"{len(cached)} cached result(s) for {query!r}")
+                    return
+            state["task"] = asyncio.get_running_loop().create_task(debounced_search(state["generation"], query))
+
+        def download(entry: dict):
+            entry["state"] = "⬇️ "
+            app.invalidate()
+            try:
+                entry["path"] = YouTubeFetcher.download_video(
+                    entry["url"], fmt, output_path, quiet=True, options=options
+                )
+                entry["state"] = "✅"
+            except Exception as e:
+                entry["state"], entry["path"] = "❌", str(e)
+            app.invalidate()
+
+        def render_results():
+            if not state["results"]:
+                return [("class:status", state["status"])]
+            lines = [("class:status", state["status"] + "\n")]
+            for i, video in enumerate(state["results"]):
+                style = "reverse" if i == state["selected"] else ""
+                lines.append((style, f" {video['title']}\n"))
+            return lines
+
+        def render_downloads():
+            return [("", f"{e['state']} {e['title']}  {e.get('path') or ''}\n") for e in queued[-8:]]
+
+        kb = KeyBindings()
+
+        @kb.add("up")
+        def _(event):
+            state["selected"] = max(0, state["selected"] - 1)
+
+        @kb.add("down")
+        def _(event):
+            state["selected"] = min(max(0, len(state["results"]) - 1), state["selected"] + 1)
+
+        @kb.add("enter")
+        def _(event):
+            if not state["results"]:
+                return
+            video = state["results"][state["selected"]]
+            entry = {"title": video["title"], "url": video["url"], "state": "⏳"}
+            queued.append(entry)
+            downloads.submit(download, entry)
+
+        @kb.add("c-c")
+        @kb.add("escape")
+        def _(event):
+            event.app.exit()
+
+        query_buffer = Buffer(multiline=False, on_text_changed=on_text_changed)
+        layout = Layout(
+            HSplit(
+                [
+                    Window(BufferControl(buffer=query_buffer), height=1, get_line_prefix=lambda *_: "🔍 "),
+                    Window(height=1, char="─"),
+                    Window(FormattedTextControl(render_results)),
+                    Window(height=1, char="─"),
+                    Window(FormattedTextControl(render_downloads), height=Dimension(max=8)),
+                ]
+            ),
+            focused_element=query_buffer,
+        )
+        app = Application(layout=layout, key_bindings=kb, full_screen=True)
+
+        async def run():
+            if initial_query:
+                query_buffer.text = initial_query  # fires on_text_changed inside the loop
+            await app.run_async()
+
+        with patch_stdout():
+            asyncio.run(run())
+        searches.shutdown(wait=False, cancel_futures=True)
+
+        running = [e for e in queued if e["state"] in ("⏳", "⬇️ ")]
+        if running:
+            print(f"Waiting for {len(running)} download(s) to finish...")
+        downloads.shutdown(wait=True)
+        for entry in queued:
+            print(f"{entry['state']} {entry['title']}  {entry.get('path') or ''}")
+
+    # -----------------------------
+    # Daemon Mode
+    # -----------------------------
+    @staticmethod
+    def socket_path() -> str:
+        runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+        if runtime_dir:
+            return os.path.join(runtime_dir, "yt-dlx.sock")
+        import tempfile
+
+        return os.path.join(tempfile.gettempdir(), f"yt-dlx-{os.getuid()}.sock")
+
+    @staticmethod
+    def _connect(socket_path: str):
+        import socket
+
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            sock.connect(socket_path)
+        except OSError:
+            sock.close()
+            return None
+        return sock
+
+    @staticmethod
+    def serve(socket_path: str):
+        import socketserver
+
+        if os.path.exists(socket_path):
+            sock = YouTubeFetcher._connect(socket_path)
+            if sock is not None:
+                sock.close()
+                print(f"❌ Error: a daemon is already listening on {socket_path}")
+                sys.exit(1)
+            os.unlink(socket_path)  # stale socket from a crashed daemon
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                channel = _DaemonChannel(self.rfile, self.wfile)
+                try:
+                    request = channel.receive()
+                except (ConnectionError, ValueError):
+                    return
+                if request.get("type") == "bandwidth":
+                    BANDWIDTH.configure(request.get("rate"), request.get("min_share"))
+                    channel.send({"type": "done", "status": 0, "bandwidth": BANDWIDTH.settings()})
+                    return
+                _SESSION.channel = channel
+                timings = Timings()
+                try:
+                    path = YouTubeFetcher.fetch(
+                        request["query"],
+                        request["format"],
+                        request["output"],
+                        request.get("audio", False),
+                        FetchOptions(**request.get("options", {})),
+                        timings,
+                    )
+                    channel.send({"type": "done", "status": 0 if path else 1, "timings": timings.report()})
+                except Exception as e:
+                    try:
+                        channel.send({"type": "error", "message": str(e)})
+                    except OSError:
+                        pass  # client went away
+                finally:
+                    _SESSION.channel = None
+
+        old_umask = os.umask(0o177)
+        try:
+            server = socketserver.ThreadingUnixStreamServer(socket_path, Handler)
+        finally:
+            os.umask(old_umask)
+        server.daemon_threads = True
+
+        # Pay the yt-dlp import and extractor setup once, up front
+        with YDL_POOL.checkout(YouTubeFetcher.SEARCH_OPTS):
+            pass
+        print(f"🚀 Serving on {socket_path}", flush=True)
+        import signal
+
+        signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            print("\nExiting...")
+        finally:
+            server.server_close()
+            try:
+                os.unlink(socket_path)
+            except OSError:
+                pass
+
+    @staticmethod
+    def configure_daemon(
+        socket_path: str, rate: Optional[float] = None, min_share: Optional[float] = None
+    ) -> Optional[dict]:
+        # Changes the daemon's bandwidth limits for everything it is running
+        # or will run; None when no daemon took the settings
+        sock = YouTubeFetcher._connect(socket_path)
+        if sock is None:
+            return None
+        with sock, sock.makefile("rwb") as stream:
+            request = {"type": "bandwidth", "rate": rate, "min_share": min_share}
+            stream.write((json.dumps(request) + "\n").encode("utf-8"))
+            stream.flush()
+            reply = json.loads(stream.readline() or "{}")
+        return reply.get("bandwidth")
+
+    @staticmethod
+    def forward_to_daemon(
+        socket_path: str,
+        query: str,
+        fmt: str,
+        output_path: str,
+        audio: bool = False,
+        options: Optional[FetchOptions] = None,
+        timings: Optional[Timings] = None,
+    ) -> Optional[int]:
+        sock = YouTubeFetcher._connect(socket_path)
+        if sock is None:
+            return None
+
+        request = {
+            "query": query,
+            "format": fmt,
+            # The daemon has its own working directory
+            "output": os.path.abspath(os.path.expanduser(output_path)),
+            "audio": audio,
+            "options": asdict(options or FetchOptions()),
+        }
+        with sock, sock.makefile("rwb") as stream:
+            stream.write((json.dumps(request) + "\n").encode("utf-8"))
+            stream.flush()
+            for line in stream:
+                msg = json.loads(line)
+                kind = msg.get("type")
+                if kind == "log":
+                    print(msg["message"], flush=True)
+                elif kind == "progress":
+                    end = "\n" if msg.get("status") != "downloading" else ""
+                    print(f"\r{msg['message']}", end=end, flush=True)
+                elif kind == "choose":
+                    videos = msg["videos"]
+
+                    def more() -> List[Dict[str, str]]:
+                        stream.write(b'{"more": true}\n')
+                        stream.flush()
+                        reply = json.loads(stream.readline())
+                        while reply.get("type") != "choose":
+                            if reply.get("type") == "log":
+                                print(reply["message"], flush=True)
+                            reply = json.loads(stream.readline())
+                        new = reply["videos"][len(videos) :]
+                        videos.extend(new)
+                        return new
+
+                    selection = YouTubeFetcher.select_video(videos, more if msg.get("paged") else None)
+                    reply = {"choice": videos.index(selection) + 1}
+                    stream.write((json.dumps(reply) + "\n").encode("utf-8"))
+                    stream.flush()
+                elif kind == "done":
+                    if timings is not None and msg.get("timings"):
+                        timings.absorb(msg["timings"])
+                    return msg["status"]
+                elif kind == "error":
+                    print(f"❌ Error: {msg['message']}")
+                    return 1
+        print("❌ Error: daemon closed the connection")
+        return 1
 
     # -----------------------------
     # Main Entrypoint
@@ -157,32 +3490,135 @@ class YouTubeFetcher:
     @staticmethod
     def main():
         args = YouTubeFetcher.parse_arguments()
-        query = args.query.strip()
+        SEARCH_CACHE.ttl = args.cache_ttl
+        SEARCH_CACHE.max_entries = args.cache_size
+        if args.bandwidth:
+            BANDWIDTH.configure(args.limit_rate, args.min_share)
+        if args.serve:
+            YouTubeFetcher.serve(args.socket)
+            return
+        if args.stats:
+            counters = STATS.all()
+            hits, misses = counters.get("speculate.hits", 0), counters.get("speculate.misses", 0)
+            if hits + misses:
+                counters["speculate.hit_rate"] = round(hits / (hits + misses), 3)
+            print(json.dumps(counters, indent=2))
+            return
+
+        if args.bandwidth and not args.query and not args.batch and not args.interactive and not args.resume:
+            settings = YouTubeFetcher.configure_daemon(args.socket, args.limit_rate, args.min_share)
+            if settings is None:
+                print(f"❌ Error: no daemon took the settings on {args.socket}")
+                sys.exit(1)
+            min_share = format_rate(settings["min_share"]) if settings["min_share"] else "none"
+            print(f"🚦 Daemon bandwidth: {format_rate(settings['rate'])}, minimum share {min_share}")
+            return
+
         fmt = args.format
         output_path = args.output.strip()
+        options = FetchOptions(
+            use_cache=not args.no_cache,
+            refresh=args.refresh,
+            dry_run=args.dry_run,
+            force=args.force,
+            prefetch=not args.no_prefetch,
+            speculate=args.speculate,
+            backends=args.backends,
+            backend_timeout=args.backend_timeout,
+            first_n=args.first_n,
+            results=args.results,
+            max_jobs=args.max_jobs,
+            connections=args.connections,
+            fragments=args.fragments,
+            pick=args.pick,
+            best=args.best,
+            target_duration=args.duration,
+            allow_channels=args.allow_channel,
+            deny_channels=args.deny_channel,
+        )
+        streaming = output_path == "-"
+        if streaming:
+            # stdout carries the media from here on; messages, prompts and
+            # yt-dlp's own output all go to stderr instead
+            sys.stdout = sys.stderr
+            options.speculate = False
+        timings = Timings()
+        if args.timings:
+            # Runs on every exit path, including sys.exit() with a failure status
+            atexit.register(timings.write, args.timings)
 
         # Use extension from -o if it matches a codec
         ext = os.path.splitext(output_path)[1].lstrip(".").lower()
         if ext in YouTubeFetcher.VALID_CODECS:
             fmt = ext
 
-        if args.audio and not ("youtube.com/watch" in query or "youtu.be/" in query):
-            query = f"{query} audio"
+        if args.interactive:
+            try:
+                YouTubeFetcher.interactive(fmt, output_path, args.audio, options, args.query or "")
+            except KeyboardInterrupt:
+                print("\nExiting...")
+            except Exception as e:
+                print(f"❌ Error: {e}")
+                sys.exit(1)
+            sys.exit(0)
 
-        try:
-            if "youtube.com/watch" in query or "youtu.be/" in query:
-                print("Detected direct YouTube link.")
-                YouTubeFetcher.download_video(query, fmt, output_path)
-                return
+        if args.resume and not args.query and not args.batch:
+            try:
+                failed = YouTubeFetcher.resume(args.jobs, options, timings)
+            except KeyboardInterrupt:
+                print("\nExiting...")
+                sys.exit(0)
+            sys.exit(1 if failed else 0)
 
-            print(f"🔍 Searching for: {query}")
-            videos = YouTubeFetcher.youtube_search(query)
-            if not videos:
-                print("No results found.")
+        searching = args.query and not YouTubeFetcher.is_youtube_url(args.query)
+        if searching and not (args.pick or args.best or args.all) and not sys.stdin.isatty():
+            # Nobody is there to answer the prompt (pipelines, cron, CI)
+            print("ℹ️ stdin is not a terminal, picking the best ranked result", file=sys.stderr)
+            options.best = True
+
+        if args.all and searching:
+            if ext:
+                print("❌ Error: --all needs a directory for -o, not a file name")
+                sys.exit(1)
+            try:
+                failed = YouTubeFetcher.fetch_all(
+                    args.query, fmt, output_path, args.audio, args.jobs, options, timings
+                )
+            except KeyboardInterrupt:
+                print("\nExiting...")
+                sys.exit(0)
+            sys.exit(1 if failed else 0)
+
+        if args.batch:
+            if ext:
+                print("❌ Error: --batch needs a directory for -o, not a file name")
                 sys.exit(1)
+            try:
+                lines = YouTubeFetcher.read_batch(args.batch)
+                failed = YouTubeFetcher.run_batch(
+                    lines, fmt, output_path, args.audio, args.jobs, options, timings
+                )
+            except KeyboardInterrupt:
+                print("\nExiting...")
+                sys.exit(0)
+            except OSError as e:
+                print(f"❌ Error: {e}")
+                sys.exit(1)
+            sys.exit(1 if failed else 0)
+
+        try:
+            # A daemon can't write into this process's stdout
+            if not args.no_daemon and not streaming:
+                if args.bandwidth:
+                    YouTubeFetcher.configure_daemon(args.socket, args.limit_rate, args.min_share)
+                status = YouTubeFetcher.forward_to_daemon(
+                    args.socket, args.query, fmt, output_path, args.audio, options, timings
+                )
+                if status is not None:
+                    sys.exit(status)
 
-            selection = YouTubeFetcher.select_video(videos)
-            YouTubeFetcher.download_video(selection["url"], fmt, output_path)
+            if YouTubeFetcher.fetch(args.query, fmt, output_path, args.audio, options, timings) is None:
+                sys.exit(1)
 
         except KeyboardInterrupt:
             print("\nExiting...")